@@ -22,4 +22,23 @@ def create_app():
     app.register_blueprint(health_bp, url_prefix='/api')
     app.register_blueprint(chat_bp, url_prefix='/api/chat')
     
+    # Start the Google cookie handshakes in the background once a request has
+    # been served: the pool's thread imports pytrends and pandas right away,
+    # which would otherwise compete with worker startup and the first request
+    from app.services.trends_sessions import trends_session_pool
+    
+    @app.after_request
+    def start_trends_sessions(response):
+        trends_session_pool.ensure_started()
+        return response
+    
+    @app.cli.command('enable-incremental-vacuum')
+    def enable_incremental_vacuum():
+        """One-off VACUUM switching an existing database to incremental auto-vacuum (stop the app first)"""
+        from app.models.database import Database
+        if Database.for_path().enable_incremental_vacuum():
+            print("Database rewritten; cache eviction now returns freed pages")
+        else:
+            print("Database already uses incremental auto-vacuum")
+    
     return app
\ No newline at end of file
@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from config import Config
+
+
+def sqlite_path_from_url(database_url: str) -> str:
+    """Turn ``sqlite:///relative.db`` / ``sqlite:////abs.db`` (or a bare path) into a file path"""
+    if '://' not in database_url:
+        return database_url
+    scheme, _, path = database_url.partition('://')
+    if scheme != 'sqlite':
+        raise ValueError(f"Unsupported DATABASE_URL scheme: {scheme}")
+    # sqlite:///foo.db -> foo.db, sqlite:////tmp/foo.db -> /tmp/foo.db
+    return path[1:] if path.startswith('/') else path
+
+
+class Database:
+    """SQLite access shared by the models
+
+    Each thread keeps one tuned connection per database file, and schema
+    setup runs once per process instead of on every model instantiation.
+    """
+
+    _instances: Dict[str, 'Database'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        self.schema_lock = threading.Lock()
+        self.initialized_schemas = set()
+        self.pid = os.getpid()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def for_path(cls, path: str = None) -> 'Database':
+        """Return the shared instance for a database file (defaults to ``Config.DATABASE_URL``)"""
+        path = path or sqlite_path_from_url(Config.DATABASE_URL)
+        key = os.path.abspath(path)
+        with cls._instances_lock:
+            database = cls._instances.get(key)
+            if database is None:
+                database = cls(path)
+                cls._instances[key] = database
+            return database
+
+    def _connect(self) -> sqlite3.Connection:
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        conn = sqlite3.connect(
+            self.path,
+            timeout=Config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None  # transactions are managed explicitly in write()
+        )
+        if new:
+            # Lets cache eviction hand freed pages back without a full VACUUM.
+            # Only a database with no header yet takes it, so this goes before WAL.
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={Config.SQLITE_SYNCHRONOUS}')
+        conn.execute(f'PRAGMA busy_timeout={int(Config.SQLITE_BUSY_TIMEOUT_MS)}')
+        # Negative cache_size is in KiB rather than pages
+        conn.execute(f'PRAGMA cache_size=-{int(Config.SQLITE_CACHE_KB)}')
+        conn.execute(f'PRAGMA mmap_size={int(Config.SQLITE_MMAP_BYTES)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use"""
+        # Connections must not cross a fork; start fresh in the child
+        if self.pid != os.getpid():
+            self.local = threading.local()
+            self.initialized_schemas = set()
+            self.pid = os.getpid()
+
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def write(self):
+        """Run a write transaction, retrying if the database stays locked past the busy timeout"""
+        conn = self.connection()
+        for attempt in range(Config.SQLITE_LOCK_RETRIES + 1):
+            try:
+                # IMMEDIATE takes the write lock up front so a read->write upgrade cannot fail halfway
+                conn.execute('BEGIN IMMEDIATE')
+                break
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) or attempt == Config.SQLITE_LOCK_RETRIES:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            # Also on GeneratorExit and KeyboardInterrupt, or the thread's connection keeps
+            # the write lock; SQLite may already have rolled back (SQLITE_FULL, SQLITE_IOERR)
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+
+    def ensure_schema(self, name: str, statements: List):
+        """Run a model's schema statements once per process
+
+        Items are SQL strings or callables taking the connection, for
+        migrations that need to inspect the existing schema first.
+        """
+        if name in self.initialized_schemas:
+            return
+        with self.schema_lock:
+            if name in self.initialized_schemas:
+                return
+            with self.write() as conn:
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+            self.initialized_schemas.add(name)
+
+    def enable_incremental_vacuum(self) -> bool:
+        """One-off migration of an existing database to incremental auto-vacuum
+
+        Databases created before incremental mode need a full VACUUM to
+        switch, which rewrites the file under an exclusive lock; run it
+        with the app stopped (``flask --app run enable-incremental-vacuum``).
+        Returns False if the database already uses incremental mode.
+        """
+        conn = self.connection()
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+            return False
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('VACUUM')
+        return True
+
+    def close(self):
+        """Close the calling thread's connection"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
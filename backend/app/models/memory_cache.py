@@ -0,0 +1,141 @@
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def deep_sizeof(obj: Any, _seen: set = None) -> int:
+    """Approximate memory footprint of a decoded JSON-like value"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_sizeof(item, _seen) for item in obj)
+    return size
+
+
+class FrequencySketch:
+    """Count-min sketch with periodic halving, the frequency estimator behind TinyLFU"""
+
+    DEPTH = 4
+    MAX_COUNT = 15
+
+    def __init__(self, width: int = 4096):
+        self.width = width
+        self.rows = [bytearray(width) for _ in range(self.DEPTH)]
+        self.additions = 0
+        # Halving after this many additions lets old popularity fade
+        self.sample_size = width * 10
+
+    def _indexes(self, key: Hashable):
+        digest = zlib.crc32(repr(key).encode('utf-8'))
+        for i in range(self.DEPTH):
+            yield i, (digest * (2 * i + 1) + i * 0x9E3779B1) % self.width
+
+    def increment(self, key: Hashable):
+        for row, index in self._indexes(key):
+            if self.rows[row][index] < self.MAX_COUNT:
+                self.rows[row][index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._reset()
+
+    def frequency(self, key: Hashable) -> int:
+        return min(self.rows[row][index] for row, index in self._indexes(key))
+
+    def _reset(self):
+        for row in self.rows:
+            for i in range(self.width):
+                row[i] >>= 1
+        self.additions //= 2
+
+
+class TinyLFUCache:
+    """Size-bounded LRU cache with TTL expiry and TinyLFU admission
+
+    Capacity is measured in approximate bytes of the stored objects. When an
+    insert needs room, the new key is only admitted if it has been requested
+    more often than the LRU victim, so one-off queries cannot flush the hot
+    set.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self.current_bytes = 0
+        self.sketch = FrequencySketch()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'rejections': 0, 'expirations': 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self.lock:
+            self.sketch.increment(key)
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, ttl: float, size: int = None) -> bool:
+        """Store a value for ``ttl`` seconds; returns False if admission was refused"""
+        if ttl <= 0:
+            return False
+        size = size if size is not None else deep_sizeof(value)
+        if size > self.max_bytes:
+            return False
+
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+            candidate_frequency = self.sketch.frequency(key)
+            while self.current_bytes + size > self.max_bytes:
+                victim_key, (_, _, victim_expires) = next(iter(self.entries.items()))
+                if victim_expires > time.monotonic() and self.sketch.frequency(victim_key) > candidate_frequency:
+                    self.stats['rejections'] += 1
+                    return False
+                self._remove(victim_key)
+                self.stats['evictions'] += 1
+
+            self.entries[key] = (value, size, time.monotonic() + ttl)
+            self.current_bytes += size
+            return True
+
+    def invalidate(self, key: Hashable):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self.entries.pop(key)
+        self.current_bytes -= size
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            stats.update({
+                'entries': len(self.entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            })
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
@@ -1,55 +1,45 @@
-import sqlite3
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+from app.models.database import Database
+from app.models.search_cache import SearchCache
+
+PRODUCT_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        price REAL,
+        rating REAL,
+        reviews_count INTEGER,
+        platform TEXT NOT NULL,
+        seller TEXT,
+        url TEXT,
+        image_url TEXT,
+        search_query TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    '''
+]
+
+INSERT_PRODUCT_SQL = '''
+    INSERT INTO products (title, price, rating, reviews_count, platform, seller, url, image_url, search_query)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
 
 class Product:
-    def __init__(self, db_path: str = 'database/marketminer.db'):
-        self.db_path = db_path
+    def __init__(self, db_path: str = None):
+        self.db = Database.for_path(db_path)
+        self.db_path = self.db.path
         self.init_db()
+        self.search_cache = SearchCache(self.db)
     
     def init_db(self):
-        """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                price REAL,
-                rating REAL,
-                reviews_count INTEGER,
-                platform TEXT NOT NULL,
-                seller TEXT,
-                url TEXT,
-                image_url TEXT,
-                search_query TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS search_cache (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                query TEXT NOT NULL,
-                platform TEXT NOT NULL,
-                results TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Initialize the database with required tables (once per process)"""
+        self.db.ensure_schema('product', PRODUCT_SCHEMA)
     
-    def save_product(self, product_data: Dict) -> int:
-        """Save a product to the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO products (title, price, rating, reviews_count, platform, seller, url, image_url, search_query)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    @staticmethod
+    def _product_row(product_data: Dict) -> tuple:
+        return (
             product_data.get('title'),
             product_data.get('price'),
             product_data.get('rating'),
@@ -59,42 +49,44 @@ class Product:
             product_data.get('url'),
             product_data.get('image_url'),
             product_data.get('search_query')
-        ))
-        
-        product_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        )
+    
+    def save_product(self, product_data: Dict) -> int:
+        """Save a product to the database"""
+        with self.db.write() as conn:
+            cursor = conn.execute(INSERT_PRODUCT_SQL, self._product_row(product_data))
+            product_id = cursor.lastrowid
         
         return product_id
     
+    def save_products(self, products: List[Dict]):
+        """Save many products in a single transaction"""
+        if not products:
+            return
+        with self.db.write() as conn:
+            conn.executemany(INSERT_PRODUCT_SQL, [self._product_row(p) for p in products])
+    
+    def enqueue_products(self, products: List[Dict]) -> bool:
+        """Hand products to the background writer without waiting for the insert"""
+        from app.models.product_writer import get_product_writer
+        return get_product_writer(self.db_path).enqueue(products)
+    
     def get_cached_results(self, query: str, platform: str) -> Optional[str]:
         """Get cached search results if they exist and are fresh"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Check for results within the last 24 hours
-        cutoff_time = datetime.now() - timedelta(hours=24)
-        
-        cursor.execute('''
-            SELECT results FROM search_cache 
-            WHERE query = ? AND platform = ? AND created_at > ?
-            ORDER BY created_at DESC LIMIT 1
-        ''', (query, platform, cutoff_time))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        return result[0] if result else None
+        return self.search_cache.get(query, platform)
     
     def cache_results(self, query: str, platform: str, results: str):
         """Cache search results"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO search_cache (query, platform, results)
-            VALUES (?, ?, ?)
-        ''', (query, platform, results))
-        
-        conn.commit()
-        conn.close()
\ No newline at end of file
+        self.search_cache.set(query, platform, results)
+    
+    def get_cached_products(self, query: str, platform: str) -> Optional[List[Dict]]:
+        """Get fresh cached products, served from memory when hot"""
+        return self.search_cache.get_products(query, platform)
+    
+    def lookup_cached_products(self, query: str, platform: str) -> Optional[Tuple[List[Dict], bool]]:
+        """Get cached products along with whether they are past their TTL"""
+        return self.search_cache.lookup_products(query, platform)
+    
+    def cache_products(self, query: str, platform: str, products: List[Dict]):
+        """Cache search results in memory and on disk"""
+        self.search_cache.set_products(query, platform, products)
@@ -0,0 +1,130 @@
+import queue
+import threading
+import time
+from typing import Dict, List
+
+from config import Config
+from app.models.product import Product
+from app.services.background import BackgroundThread
+
+
+class ProductWriter:
+    """Write-behind persistence for scraped products
+
+    Requests enqueue products and return immediately; a background thread
+    groups them into one ``executemany`` transaction per batch, flushing
+    when ``batch_size`` rows are pending or ``flush_interval`` seconds have
+    passed, and once more at interpreter shutdown.
+    """
+
+    def __init__(self, db_path: str = None, batch_size: int = None,
+                 flush_interval: float = None, max_queue: int = None):
+        self.db_path = db_path
+        self.batch_size = batch_size or Config.WRITE_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.WRITE_FLUSH_INTERVAL
+        self.queue = queue.Queue(maxsize=max_queue or Config.WRITE_QUEUE_SIZE)
+        self.lock = threading.Lock()
+        # Stopped at interpreter exit like every background thread; _run then drains the queue
+        self.worker = BackgroundThread('product-writer', self._run)
+        self.stats = {'enqueued': 0, 'written': 0, 'batches': 0, 'dropped': 0, 'errors': 0}
+
+    def enqueue(self, products: List[Dict]) -> bool:
+        """Queue products for persistence; never blocks the caller"""
+        self.worker.ensure_started()
+        enqueued = 0
+        for product in products:
+            try:
+                self.queue.put_nowait(product)
+                enqueued += 1
+            except queue.Full:
+                break
+
+        dropped = len(products) - enqueued
+        with self.lock:
+            self.stats['enqueued'] += enqueued
+            self.stats['dropped'] += dropped
+        if dropped:
+            print(f"Product write queue full, dropped {dropped} products")
+        return dropped == 0
+
+    def _drain_batch(self, timeout: float) -> List[Dict]:
+        """Block for the first item, then collect until the batch is full or the interval ends"""
+        batch = []
+        try:
+            batch.append(self.queue.get(timeout=timeout))
+        except queue.Empty:
+            return batch
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self.worker.stopping.is_set():
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, product_model: Product, batch: List[Dict]):
+        try:
+            product_model.save_products(batch)
+            self.stats['written'] += len(batch)
+            self.stats['batches'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"Error writing product batch: {e}")
+        finally:
+            for _ in batch:
+                self.queue.task_done()
+
+    def _run(self):
+        product_model = Product(self.db_path)
+        while not self.worker.stopping.is_set():
+            batch = self._drain_batch(timeout=self.flush_interval)
+            if batch:
+                self._write(product_model, batch)
+
+        # Shutdown: write whatever is still queued
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                break
+            self._write(product_model, batch)
+
+    def flush(self, timeout: float = None):
+        """Wait until everything queued so far has been written"""
+        if not self.worker.running():
+            return
+        deadline = time.monotonic() + (timeout if timeout is not None else self.flush_interval * 10)
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def stop(self, timeout: float = 5.0):
+        """Flush pending products and stop the writer thread"""
+        self.worker.stop(timeout)
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats['pending'] = self.queue.qsize()
+        return stats
+
+
+_writers: Dict[str, ProductWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_product_writer(db_path: str = None) -> ProductWriter:
+    """Shared writer per database file"""
+    key = db_path or ''
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = ProductWriter(db_path)
+            _writers[key] = writer
+        return writer
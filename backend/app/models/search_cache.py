@@ -0,0 +1,239 @@
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from config import Config
+from app.models.database import Database
+from app.models.memory_cache import TinyLFUCache
+from app.models import cache_codec
+from app.services.background import PeriodicJob
+
+
+def _migrate_search_cache(conn):
+    """Bring older search_cache tables up to one row per (query, platform)"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(search_cache)')}
+    if 'size_bytes' not in columns:
+        conn.execute('ALTER TABLE search_cache ADD COLUMN size_bytes INTEGER NOT NULL DEFAULT 0')
+        conn.execute('UPDATE search_cache SET size_bytes = length(results)')
+
+    # Earlier versions appended a row per miss; keep only the newest per key
+    conn.execute('''
+        DELETE FROM search_cache
+        WHERE id NOT IN (SELECT MAX(id) FROM search_cache GROUP BY query, platform)
+    ''')
+
+
+SEARCH_CACHE_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS search_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        query TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        results TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    _migrate_search_cache,
+    # Lookup key; also the conflict target for upserts
+    'CREATE UNIQUE INDEX IF NOT EXISTS idx_search_cache_key ON search_cache(query, platform)',
+    # Eviction walks entries oldest first
+    'CREATE INDEX IF NOT EXISTS idx_search_cache_created ON search_cache(created_at)',
+]
+
+
+class SearchCache:
+    """Persistent search result cache: one live row per (query, platform)
+
+    Entries are fresh for a per-platform TTL and may be served stale for
+    ``CACHE_STALE_WINDOW`` after that. A background job keeps the table under
+    ``CACHE_MAX_BYTES`` by evicting expired and then oldest rows.
+    """
+
+    def __init__(self, db: Database = None):
+        self.db = db or Database.for_path()
+        self.db.ensure_schema('search_cache', SEARCH_CACHE_SCHEMA)
+        self.memory = get_memory_cache(self.db)
+        get_cache_maintenance(self.db).ensure_started()
+
+    @staticmethod
+    def ttl_for(platform: str) -> int:
+        """Freshness window in seconds for a platform's results"""
+        return Config.CACHE_TTL_BY_PLATFORM.get(platform.lower(), Config.CACHE_DURATION)
+
+    def get_entry(self, query: str, platform: str) -> Optional[Tuple[Union[str, bytes], float]]:
+        """Return ``(stored results, age_seconds)`` for a key regardless of freshness"""
+        row = self.db.connection().execute('''
+            SELECT results, (julianday('now') - julianday(created_at)) * 86400.0
+            FROM search_cache
+            WHERE query = ? AND platform = ?
+        ''', (query, platform)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def get(self, query: str, platform: str) -> Optional[str]:
+        """Return cached results as JSON text if they are within the platform's TTL"""
+        entry = self.get_entry(query, platform)
+        if entry and entry[1] < self.ttl_for(platform):
+            results = entry[0]
+            return results if isinstance(results, str) else json.dumps(cache_codec.decode(results))
+        return None
+
+    def get_products(self, query: str, platform: str) -> Optional[List[Dict]]:
+        """Return fresh cached products, decoded"""
+        found = self.lookup_products(query, platform, stale_window=0)
+        return found[0] if found else None
+
+    def lookup_products(self, query: str, platform: str,
+                        stale_window: int = None) -> Optional[Tuple[List[Dict], bool]]:
+        """Return ``(products, stale)`` for an entry within its TTL plus ``stale_window``
+
+        Hot keys are answered from the in-process memory tier with no disk
+        I/O or JSON decoding; misses fall through to SQLite and populate it.
+        Stale entries are only ever read from SQLite, so the memory tier
+        never holds them.
+        """
+        products = self.memory.get((query, platform))
+        if products is not None:
+            return products, False
+
+        entry = self.get_entry(query, platform)
+        if not entry:
+            return None
+        results, age = entry
+        ttl = self.ttl_for(platform)
+        if stale_window is None:
+            stale_window = Config.CACHE_STALE_WINDOW
+        if age >= ttl + stale_window:
+            return None
+
+        products = cache_codec.decode(results)
+        if age >= ttl:
+            return products, True
+        # Expire from memory at the same moment the persistent entry goes stale
+        self.memory.put((query, platform), products, ttl - age)
+        return products, False
+
+    def set_products(self, query: str, platform: str, products: List[Dict]):
+        """Cache products in both tiers"""
+        self.set(query, platform, cache_codec.encode(products))
+        self.memory.put((query, platform), products, self.ttl_for(platform))
+
+    def set(self, query: str, platform: str, results: Union[str, bytes]):
+        """Insert or replace the entry for a key (JSON text or an encoded BLOB)"""
+        self.memory.invalidate((query, platform))
+        with self.db.write() as conn:
+            conn.execute('''
+                INSERT INTO search_cache (query, platform, results, size_bytes, created_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(query, platform) DO UPDATE SET
+                    results = excluded.results,
+                    size_bytes = excluded.size_bytes,
+                    created_at = excluded.created_at
+            ''', (query, platform, results, len(results)))
+
+
+class CacheMaintenance:
+    """Background eviction and compaction for the search cache"""
+
+    def __init__(self, db: Database, interval: float = None, max_bytes: int = None):
+        self.db = db
+        self.interval = interval or Config.CACHE_EVICTION_INTERVAL
+        self.max_bytes = max_bytes or Config.CACHE_MAX_BYTES
+        self.lock = threading.Lock()
+        self.worker = PeriodicJob('cache-maintenance', self.run_once, lambda: self.interval, 'cache maintenance')
+        self.stats = {'runs': 0, 'expired': 0, 'evicted': 0, 'last_run': None}
+
+    def ensure_started(self):
+        self.worker.ensure_started()
+
+    def expiry_horizon(self) -> int:
+        """Age in seconds past which no platform will serve an entry, even stale"""
+        return max([Config.CACHE_DURATION] + list(Config.CACHE_TTL_BY_PLATFORM.values())) + Config.CACHE_STALE_WINDOW
+
+    def run_once(self) -> Dict:
+        """Evict expired rows, then oldest rows until under the byte budget, then compact"""
+        with self.db.write() as conn:
+            expired = conn.execute('''
+                DELETE FROM search_cache
+                WHERE created_at < datetime('now', ?)
+            ''', (f'-{self.expiry_horizon()} seconds',)).rowcount
+
+            evicted = 0
+            total = conn.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM search_cache').fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                victims = []
+                for row_id, size in conn.execute('SELECT id, size_bytes FROM search_cache ORDER BY created_at'):
+                    victims.append((row_id,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                conn.executemany('DELETE FROM search_cache WHERE id = ?', victims)
+                evicted = len(victims)
+
+        if expired or evicted:
+            self.compact()
+
+        with self.lock:
+            self.stats['runs'] += 1
+            self.stats['expired'] += expired
+            self.stats['evicted'] += evicted
+            self.stats['last_run'] = time.time()
+        return {'expired': expired, 'evicted': evicted}
+
+    def compact(self):
+        """Return freed pages to the filesystem and truncate the WAL
+        
+        Only databases in incremental auto-vacuum mode give pages back; older
+        ones keep their free pages for reuse until migrated with
+        ``Database.enable_incremental_vacuum``. A full VACUUM here would hold
+        an exclusive lock past every writer's busy timeout.
+        """
+        conn = self.db.connection()
+        if self.incremental_vacuum():
+            # execute() only steps the pragma once, freeing a single page;
+            # executescript() runs it to completion
+            conn.executescript('PRAGMA incremental_vacuum')
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    
+    def incremental_vacuum(self) -> bool:
+        return self.db.connection().execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+
+    def get_stats(self) -> Dict:
+        row = self.db.connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM search_cache'
+        ).fetchone()
+        with self.lock:
+            stats = dict(self.stats)
+        stats.update({'entries': row[0], 'bytes': row[1], 'max_bytes': self.max_bytes,
+                      'incremental_vacuum': self.incremental_vacuum()})
+        return stats
+
+
+_maintenance: Dict[str, CacheMaintenance] = {}
+_maintenance_lock = threading.Lock()
+
+
+def get_cache_maintenance(db: Database = None) -> CacheMaintenance:
+    """Shared maintenance job per database file"""
+    db = db or Database.for_path()
+    with _maintenance_lock:
+        job = _maintenance.get(db.path)
+        if job is None:
+            job = CacheMaintenance(db)
+            _maintenance[db.path] = job
+        return job
+
+
+_memory_caches: Dict[str, TinyLFUCache] = {}
+
+
+def get_memory_cache(db: Database = None) -> TinyLFUCache:
+    """Shared in-process tier per database file"""
+    db = db or Database.for_path()
+    with _maintenance_lock:
+        cache = _memory_caches.get(db.path)
+        if cache is None:
+            cache = TinyLFUCache(Config.MEMORY_CACHE_MAX_BYTES)
+            _memory_caches[db.path] = cache
+        return cache
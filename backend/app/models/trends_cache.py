@@ -0,0 +1,134 @@
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from app.models.database import Database
+from app.models import cache_codec
+
+TRENDS_CACHE_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS trends_cache (
+        cache_key TEXT PRIMARY KEY,
+        results BLOB NOT NULL,
+        is_fallback INTEGER NOT NULL DEFAULT 0,
+        size_bytes INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_trends_cache_created ON trends_cache(created_at)',
+]
+
+
+def trends_cache_key(keywords: List[str], timeframe: str, geo: str = '') -> str:
+    """Key for a trends request: keyword order does not change the data"""
+    return json.dumps([sorted(keywords), timeframe, geo or ''], separators=(',', ':'))
+
+
+def parse_trends_cache_key(cache_key: str) -> Tuple[List[str], str, str]:
+    keywords, timeframe, geo = json.loads(cache_key)
+    return keywords, timeframe, geo
+
+
+class TrendsCache:
+    """Persistent Google Trends results keyed by (sorted keywords, timeframe, geo)
+
+    Live results are fresh for ``TRENDS_CACHE_TTL``; mock data served after
+    an upstream error is kept only for ``TRENDS_FALLBACK_TTL`` so the real
+    data is retried soon. Both may be served stale for
+    ``CACHE_STALE_WINDOW`` while a refresh runs.
+    """
+
+    def __init__(self, db: Database = None):
+        self.db = db or Database.for_path()
+        self.db.ensure_schema('trends_cache', TRENDS_CACHE_SCHEMA)
+        self.lock = threading.Lock()
+        # mock_fallbacks counts mock data generated because upstream failed;
+        # serving that data again from the cache counts as a hit
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'fetches': 0, 'mock_fallbacks': 0}
+
+    @staticmethod
+    def ttl_for(is_fallback: bool) -> int:
+        return Config.TRENDS_FALLBACK_TTL if is_fallback else Config.TRENDS_CACHE_TTL
+
+    def count(self, name: str):
+        with self.lock:
+            self.stats[name] += 1
+
+    def get_entry(self, cache_key: str) -> Optional[Tuple[bytes, bool, float]]:
+        """Return ``(stored results, is_fallback, age_seconds)`` regardless of freshness"""
+        row = self.db.connection().execute('''
+            SELECT results, is_fallback, (julianday('now') - julianday(created_at)) * 86400.0
+            FROM trends_cache
+            WHERE cache_key = ?
+        ''', (cache_key,)).fetchone()
+        return (row[0], bool(row[1]), row[2]) if row else None
+
+    def expires_in(self, cache_key: str) -> Optional[float]:
+        """Seconds until the entry goes stale (negative once it has)"""
+        entry = self.get_entry(cache_key)
+        return self.ttl_for(entry[1]) - entry[2] if entry else None
+
+    def lookup(self, cache_key: str, stale_window: int = None) -> Optional[Tuple[Dict, bool]]:
+        """Return ``(trend data, stale)`` for an entry within its TTL plus ``stale_window``"""
+        entry = self.get_entry(cache_key)
+        if not entry:
+            return None
+        results, is_fallback, age = entry
+        ttl = self.ttl_for(is_fallback)
+        if stale_window is None:
+            stale_window = Config.CACHE_STALE_WINDOW
+        if age >= ttl + stale_window:
+            return None
+        return cache_codec.decode(results), age >= ttl
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """Return fresh trend data only"""
+        found = self.lookup(cache_key, stale_window=0)
+        return found[0] if found else None
+
+    def get_live(self, cache_key: str) -> Optional[Dict]:
+        """Return the last upstream (non-fallback) results, whatever their age"""
+        entry = self.get_entry(cache_key)
+        return cache_codec.decode(entry[0]) if entry and not entry[1] else None
+
+    def set(self, cache_key: str, data: Dict, is_fallback: bool = False):
+        payload = cache_codec.encode(data)
+        with self.db.write() as conn:
+            conn.execute('''
+                INSERT INTO trends_cache (cache_key, results, is_fallback, size_bytes, created_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    results = excluded.results,
+                    is_fallback = excluded.is_fallback,
+                    size_bytes = excluded.size_bytes,
+                    created_at = excluded.created_at
+            ''', (cache_key, payload, int(is_fallback), len(payload)))
+            # Few rows and rare writes, so expired rows are dropped here rather than by a job
+            conn.execute('''
+                DELETE FROM trends_cache WHERE created_at < datetime('now', ?)
+            ''', (f'-{Config.TRENDS_CACHE_TTL + Config.CACHE_STALE_WINDOW} seconds',))
+
+    def get_stats(self) -> Dict:
+        row = self.db.connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(is_fallback), 0) FROM trends_cache'
+        ).fetchone()
+        with self.lock:
+            stats = dict(self.stats)
+        stats.update({'entries': row[0], 'bytes': row[1], 'fallback_entries': row[2]})
+        return stats
+
+
+_trends_caches: Dict[str, TrendsCache] = {}
+_trends_caches_lock = threading.Lock()
+
+
+def get_trends_cache(db: Database = None) -> TrendsCache:
+    """Shared trends cache (and its counters) per database file"""
+    db = db or Database.for_path()
+    with _trends_caches_lock:
+        cache = _trends_caches.get(db.path)
+        if cache is None:
+            cache = TrendsCache(db)
+            _trends_caches[db.path] = cache
+        return cache
@@ -0,0 +1,317 @@
+"""
+On-disk history of Google Trends interest over time
+
+Each series (a keyword set, geo and resolution) is a keywords x time
+float32 matrix in its own ``.npy`` file. Reads memory-map the file and copy
+out only the requested range; appends write into spare capacity in place.
+A SQLite table indexes where each series starts, its step in days and how
+many points are filled.
+
+Google scales every response so its own peak is 100, so new data cannot
+simply be appended: it is fetched with a few stored points of overlap,
+rescaled so the overlap agrees, and written over the tail.
+The stored values are therefore on the scale of the first full fetch, and
+readers renormalise whatever range they take to 0-100.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from app.models.database import Database
+
+TRENDS_SERIES_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS trends_series (
+        series_key TEXT PRIMARY KEY,
+        keywords TEXT NOT NULL,
+        geo TEXT NOT NULL,
+        step_days INTEGER NOT NULL,
+        start_day INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        file TEXT NOT NULL,
+        full_fetched_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    ''',
+]
+
+# Google returns daily points for windows up to this many days, weekly up to
+# MAX_WEEKLY_SPAN, and monthly beyond (not stored: months are uneven steps)
+MAX_DAILY_SPAN = 269
+MAX_WEEKLY_SPAN = 1890
+
+_RELATIVE_TIMEFRAME = re.compile(r'^today (\d+)-([my])$')
+_EXPLICIT_TIMEFRAME = re.compile(r'^(\d{4}-\d{2}-\d{2}) (\d{4}-\d{2}-\d{2})$')
+
+
+def to_days(dates) -> np.ndarray:
+    """Dates (datetime64, pandas index or ISO strings) as integer days since 1970-01-01"""
+    return np.asarray(dates).astype('datetime64[D]').astype(np.int64)
+
+
+def from_days(days) -> np.ndarray:
+    return np.asarray(days, dtype=np.int64).astype('datetime64[D]')
+
+
+def resolution(span_days: int) -> Optional[int]:
+    """Step in days of the points Google returns for a window of ``span_days``"""
+    if span_days <= MAX_DAILY_SPAN:
+        return 1
+    if span_days <= MAX_WEEKLY_SPAN:
+        return 7
+    return None
+
+
+def timeframe_window(timeframe: str, today: date = None) -> Optional[Tuple[int, int, int]]:
+    """``(first day, last day, step)`` a timeframe covers, or None if it cannot be stored
+
+    Understands ``today N-m``, ``today N-y`` and explicit ``YYYY-MM-DD
+    YYYY-MM-DD`` windows; hourly (``now ...``) and monthly resolutions are
+    left to plain fetches.
+    """
+    today = today or date.today()
+    relative = _RELATIVE_TIMEFRAME.match(timeframe.strip())
+    explicit = _EXPLICIT_TIMEFRAME.match(timeframe.strip())
+    if relative:
+        count, unit = int(relative.group(1)), relative.group(2)
+        start, end = today - timedelta(days=round(count * (365.25 / 12 if unit == 'm' else 365.25))), today
+    elif explicit:
+        start, end = date.fromisoformat(explicit.group(1)), date.fromisoformat(explicit.group(2))
+    else:
+        return None
+
+    step = resolution((end - start).days)
+    if step is None or end < start:
+        return None
+    return int(to_days(start.isoformat())), int(to_days(end.isoformat())), step
+
+
+def trends_series_key(keywords: List[str], geo: str, step: int) -> str:
+    return json.dumps([sorted(keywords), geo or '', step], separators=(',', ':'))
+
+
+def resample(days: np.ndarray, values: np.ndarray, start_day: int, step: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Average points onto the grid ``start_day + k * step``; returns ``(k, keywords x k matrix)``
+
+    Daily delta data for a weekly series becomes weekly means; data already
+    on the grid passes through unchanged. Buckets with no points are filled
+    from the previous bucket.
+    """
+    buckets = (np.asarray(days, dtype=np.int64) - start_day) // step
+    first, last = int(buckets.min()), int(buckets.max())
+    slots = buckets - first
+    counts = np.bincount(slots, minlength=last - first + 1)
+    values = np.asarray(values, dtype=np.float64)
+    sums = np.stack([np.bincount(slots, weights=row, minlength=len(counts)) for row in values])
+    present = counts > 0
+    # Forward-fill empty buckets with the index of the last non-empty one
+    source = np.maximum.accumulate(np.where(present, np.arange(len(counts)), 0))
+    means = sums[:, present.nonzero()[0]] / counts[present]
+    lookup = np.cumsum(present) - 1
+    return np.arange(first, last + 1), means[:, lookup[source]]
+
+
+class StoredSeries:
+    __slots__ = ('key', 'keywords', 'geo', 'step', 'start_day', 'length', 'file',
+                 'full_fetched_at', 'updated_at')
+
+    def __init__(self, key, keywords, geo, step, start_day, length, file, full_fetched_at, updated_at):
+        self.key = key
+        self.keywords = keywords
+        self.geo = geo
+        self.step = step
+        self.start_day = start_day
+        self.length = length
+        self.file = file
+        self.full_fetched_at = full_fetched_at
+        self.updated_at = updated_at
+
+    def day_at(self, position: int) -> int:
+        return self.start_day + position * self.step
+
+    @property
+    def end_day(self) -> int:
+        return self.day_at(self.length - 1)
+
+
+class TrendsSeriesStore:
+    """Memory-mapped interest-over-time matrices with a SQLite index
+
+    Rows are the series' keywords in sorted order. Writers hold the SQLite
+    write lock for the whole splice, which serialises them across workers;
+    a file that has to grow is rebuilt beside the old one and swapped in
+    with ``os.replace``, so readers never see a half-written file.
+    """
+
+    def __init__(self, db: Database = None, directory: str = None):
+        self.db = db or Database.for_path()
+        self.db.ensure_schema('trends_series', TRENDS_SERIES_SCHEMA)
+        self.directory = directory or Config.TRENDS_SERIES_DIR or os.path.join(
+            os.path.dirname(os.path.abspath(self.db.path)), 'trends_series'
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.stats = {
+            'full_writes': 0, 'splices': 0, 'splice_rejected': 0,
+            'delta_fetches': 0, 'local_reads': 0, 'points_fetched': 0
+        }
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def _load(self, row) -> StoredSeries:
+        key, keywords, geo, step, start_day, length, file, full_fetched_at, updated_at = row
+        return StoredSeries(key, json.loads(keywords), geo, step, start_day, length,
+                            os.path.join(self.directory, file), full_fetched_at, updated_at)
+
+    def get(self, keywords: List[str], geo: str, step: int, conn=None) -> Optional[StoredSeries]:
+        row = (conn or self.db.connection()).execute('''
+            SELECT series_key, keywords, geo, step_days, start_day, length, file, full_fetched_at, updated_at
+            FROM trends_series
+            WHERE series_key = ?
+        ''', (trends_series_key(keywords, geo, step),)).fetchone()
+        return self._load(row) if row else None
+
+    def read(self, series: StoredSeries, first_day: int = None, last_day: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """``(days, keywords x points matrix)`` for the stored points in ``[first_day, last_day]``
+
+        Only the requested columns are copied out of the mapped file.
+        """
+        begin = 0 if first_day is None else max(0, -(-(first_day - series.start_day) // series.step))
+        end = series.length if last_day is None else min(series.length, (last_day - series.start_day) // series.step + 1)
+        end = max(begin, end)
+        matrix = np.load(series.file, mmap_mode='r')
+        self.count('local_reads')
+        return (series.start_day + np.arange(begin, end) * series.step,
+                np.array(matrix[:, begin:end], dtype=np.float64))
+
+    def write(self, keywords: List[str], geo: str, step: int, days: np.ndarray, values: np.ndarray,
+              full: bool) -> Optional[StoredSeries]:
+        """Merge fetched points (rows in ``keywords`` order) into the stored series
+
+        New data that overlaps the stored tail is spliced in, rescaled
+        against the overlap; data that starts before the stored series (or
+        leaves a gap after it) replaces it, and only a ``full`` fetch may do
+        that. Returns None when the data cannot be placed, so the caller
+        falls back to a full fetch.
+        """
+        order = np.argsort(keywords, kind='stable')
+        values = np.asarray(values, dtype=np.float64)[order]
+        with self.db.write() as conn:
+            series = self.get(keywords, geo, step, conn)
+            spliced = self._splice(conn, series, days, values, full) if series else None
+            if spliced is not None:
+                self.count('splices')
+                return spliced
+            if not full:
+                self.count('splice_rejected')
+                return None
+            self.count('full_writes')
+            return self._replace(conn, sorted(keywords), geo, step, days, values)
+
+    def _splice(self, conn, series: StoredSeries, days, values, full: bool) -> Optional[StoredSeries]:
+        positions, resampled = resample(days, values, series.start_day, series.step)
+        first, last = int(positions[0]), int(positions[-1])
+        if first < 0 or first > series.length - 1:
+            return None
+
+        # The stored last point is often a partial period; calibrate on the ones before it
+        overlap_end = min(series.length - 1, last + 1)
+        if overlap_end <= first:
+            return None
+        stored_total = float(np.load(series.file, mmap_mode='r')[:, first:overlap_end].sum())
+        new_total = float(resampled[:, :overlap_end - first].sum())
+        if stored_total <= 0 or new_total <= 0:
+            return None
+        scaled = (resampled * (stored_total / new_total)).astype(np.float32)
+
+        # A window ending before the stored tail rewrites the middle and keeps the tail
+        length = max(series.length, last + 1)
+        capacity = np.load(series.file, mmap_mode='r').shape[1]
+        if length <= capacity:
+            matrix = np.load(series.file, mmap_mode='r+')
+            matrix[:, first:last + 1] = scaled
+            matrix.flush()
+            del matrix
+        else:
+            grown = np.zeros((len(series.keywords), max(length, 2 * capacity)), dtype=np.float32)
+            grown[:, :first] = np.load(series.file, mmap_mode='r')[:, :first]
+            grown[:, first:last + 1] = scaled
+            self._save(series.file, grown)
+
+        now = time.time()
+        full_fetched_at = now if full else series.full_fetched_at
+        conn.execute(
+            'UPDATE trends_series SET length = ?, full_fetched_at = ?, updated_at = ? WHERE series_key = ?',
+            (length, full_fetched_at, now, series.key)
+        )
+        return StoredSeries(series.key, series.keywords, series.geo, series.step, series.start_day,
+                            length, series.file, full_fetched_at, now)
+
+    def _replace(self, conn, keywords: List[str], geo: str, step: int, days, values) -> StoredSeries:
+        start_day = int(np.min(days))
+        positions, resampled = resample(days, values, start_day, step)
+        length = len(positions)
+        # Spare columns so daily or weekly deltas append in place for a while
+        matrix = np.zeros((len(keywords), length + max(16, length // 4)), dtype=np.float32)
+        matrix[:, :length] = resampled
+
+        key = trends_series_key(keywords, geo, step)
+        # Stable per key so a replacement swaps the file rather than adding one
+        file = f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}-{step}d.npy"
+        self._save(os.path.join(self.directory, file), matrix)
+
+        now = time.time()
+        conn.execute('''
+            INSERT INTO trends_series
+                (series_key, keywords, geo, step_days, start_day, length, file, full_fetched_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(series_key) DO UPDATE SET
+                start_day = excluded.start_day,
+                length = excluded.length,
+                file = excluded.file,
+                full_fetched_at = excluded.full_fetched_at,
+                updated_at = excluded.updated_at
+        ''', (key, json.dumps(keywords), geo or '', step, start_day, length, file, now, now))
+        return StoredSeries(key, keywords, geo or '', step, start_day, length,
+                            os.path.join(self.directory, file), now, now)
+
+    @staticmethod
+    def _save(path: str, matrix: np.ndarray):
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, 'wb') as handle:
+            np.save(handle, matrix)
+        os.replace(temporary, path)
+
+    def get_stats(self) -> Dict:
+        row = self.db.connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(length), 0) FROM trends_series'
+        ).fetchone()
+        with self.lock:
+            stats = dict(self.stats)
+        stats.update({'series': row[0], 'points': row[1], 'directory': self.directory})
+        return stats
+
+
+_series_stores: Dict[str, TrendsSeriesStore] = {}
+_series_stores_lock = threading.Lock()
+
+
+def get_trends_series_store(db: Database = None) -> TrendsSeriesStore:
+    """Shared series store (and its counters) per database file"""
+    db = db or Database.for_path()
+    with _series_stores_lock:
+        store = _series_stores.get(db.path)
+        if store is None:
+            store = TrendsSeriesStore(db)
+            _series_stores[db.path] = store
+        return store
@@ -1,10 +1,19 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from flask import Blueprint, request, jsonify
+from config import Config
 from app.services.ai_analyzer import AIAnalyzer
-from app.services.scraper import MarketplaceScraper
-from app.services.trends import TrendsAnalyzer
+from app.services.event_stream import event_stream
+from app.services.product_search import product_search
 
 analysis_bp = Blueprint('analysis', __name__)
 
+# Trends for streamed reports, fetched while the product search runs
+_trends_executor = ThreadPoolExecutor(
+    max_workers=Config.ANALYSIS_STREAM_WORKERS,
+    thread_name_prefix='analysis-trends'
+)
+
 @analysis_bp.route('/opportunity', methods=['POST'])
 def analyze_opportunity():
     """Comprehensive opportunity analysis"""
@@ -17,42 +26,26 @@ def analyze_opportunity():
         if not query:
             return jsonify({'error': 'Query is required'}), 400
         
-        # Get product data
-        scraper = MarketplaceScraper()
-        all_products = []
-        
-        for platform in platforms:
-            if platform.lower() == 'amazon':
-                products = scraper.search_amazon(query, 20)
-            elif platform.lower() == 'ebay':
-                products = scraper.search_ebay(query, 20)
-            else:
-                continue
-            all_products.extend(products)
+        # Get product data through the shared search path, so the normalized
+        # cache key is reused across the search, analysis and chat routes
+        all_products = product_search.search(query, platforms, 20)['products']
         
         # Get trend data if requested
-        trend_data = None
-        if include_trends:
-            analyzer = TrendsAnalyzer()
-            keywords = [query] + query.split()[:4]  # Use query + individual words
-            trend_data = analyzer.get_trend_data(keywords)
+        trend_data = _get_trend_data(query) if include_trends else None
         
-        # AI Analysis
+        # AI Analysis, reporting the same score as the streamed report
         ai_analyzer = AIAnalyzer()
-        analysis = ai_analyzer.analyze_products(all_products, trend_data)
+        score = ai_analyzer.opportunity_score(all_products, trend_data)
+        analysis = ai_analyzer.analyze_products(all_products, trend_data, score)
         
         # Compile comprehensive report
         report = {
             'query': query,
             'timestamp': data.get('timestamp'),
-            'product_data': {
-                'total_products': len(all_products),
-                'platforms': platforms,
-                'products': all_products[:10]  # Return top 10 for display
-            },
+            'product_data': _product_data(all_products, platforms),
             'trend_data': trend_data,
             'ai_analysis': analysis,
-            'opportunity_score': analysis.get('opportunity_score', 0),
+            'opportunity_score': score,
             'recommendations': _generate_recommendations(all_products, trend_data, analysis)
         }
         
@@ -61,6 +54,70 @@ def analyze_opportunity():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@analysis_bp.route('/opportunity/stream', methods=['POST'])
+def analyze_opportunity_stream():
+    """Same report as /opportunity, one Server-Sent Event per section
+    
+    Sections go out as soon as they are ready, in the order
+    ``product_data``, ``trend_data``, ``opportunity_score``,
+    ``ai_analysis``, ``recommendations``, followed by ``done``. Trends are
+    fetched while the products are searched. Each section event carries
+    the section under ``data`` and the time spent producing it in
+    ``duration_ms``.
+    """
+    data = request.get_json(silent=True) or {}
+    query = data.get('query', '').strip()
+    platforms = data.get('platforms', ['Amazon', 'eBay'])
+    include_trends = data.get('include_trends', True)
+    
+    if not query:
+        return jsonify({'error': 'Query is required'}), 400
+    
+    return event_stream(_opportunity_events(query, platforms, include_trends, data.get('timestamp')))
+
+def _opportunity_events(query, platforms, include_trends, timestamp):
+    # Trends only need the query, so they do not wait for the product search
+    trends = _trends_executor.submit(_timed, _get_trend_data, query) if include_trends else None
+    
+    all_products, duration = _timed(lambda: product_search.search(query, platforms, 20)['products'])
+    yield 'product_data', {'data': _product_data(all_products, platforms), 'duration_ms': duration}
+    
+    trend_data, duration = trends.result() if trends else (None, 0.0)
+    yield 'trend_data', {'data': trend_data, 'duration_ms': duration}
+    
+    ai_analyzer = AIAnalyzer()
+    score, duration = _timed(ai_analyzer.opportunity_score, all_products, trend_data)
+    yield 'opportunity_score', {'data': score, 'duration_ms': duration}
+    
+    # The analysis reports the score already sent instead of computing its own
+    analysis, duration = _timed(ai_analyzer.analyze_products, all_products, trend_data, score)
+    yield 'ai_analysis', {'data': analysis, 'duration_ms': duration}
+    
+    recommendations, duration = _timed(_generate_recommendations, all_products, trend_data, analysis)
+    yield 'recommendations', {'data': recommendations, 'duration_ms': duration}
+    
+    yield 'done', {'query': query, 'timestamp': timestamp}
+
+def _timed(func, *args):
+    """``(result, milliseconds taken)`` of ``func(*args)``"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, round((time.perf_counter() - start) * 1000, 1)
+
+def _get_trend_data(query):
+    # Imported on first use: pandas, numpy and pytrends stay out of worker startup
+    from app.services.trends import TrendsAnalyzer
+    analyzer = TrendsAnalyzer()
+    keywords = [query] + query.split()[:4]  # Use query + individual words
+    return analyzer.get_trend_data(keywords)
+
+def _product_data(all_products, platforms):
+    return {
+        'total_products': len(all_products),
+        'platforms': platforms,
+        'products': all_products[:10]  # Return top 10 for display
+    }
+
 @analysis_bp.route('/score', methods=['POST'])
 def calculate_score():
     """Calculate opportunity score for given data"""
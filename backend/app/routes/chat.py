@@ -1,10 +1,11 @@
 from flask import Blueprint, request, jsonify
 import re
 import json
-from app.services.scraper import MarketplaceScraper
-from app.services.trends import TrendsAnalyzer
-from app.services.ai_analyzer import AIAnalyzer
+from app.services.event_stream import event_stream
 from app.services.image_service import image_service
+from app.services.query_normalizer import normalize_query
+
+chat_bp = Blueprint('chat', __name__)
 
 
 class ConversationalAI:
@@ -139,15 +140,7 @@ class ConversationalAI:
 def process_chat_message():
     """Process a chat message and return AI response with product suggestions"""
     try:
-        data = request.get_json()
-        
-        # Handle both old format (string) and new format (object)
-        if isinstance(data, str):
-            user_message = data.strip()
-            context = {}
-        else:
-            user_message = data.get('message', '').strip()
-            context = data.get('context', {})
+        user_message, context = _parse_chat_request(request.get_json())
         
         if not user_message:
             return jsonify({'error': 'Message is required'}), 400
@@ -155,11 +148,10 @@ def process_chat_message():
 
         
         # Simple but effective conversational logic
-        user_lower = user_message.lower()
         last_products = context.get('lastProducts', [])
         
         # Handle conversational questions about previous results
-        if last_products and any(word in user_lower for word in ['why', 'how', 'what', 'these', 'them', 'explain']):
+        if _is_follow_up(user_message, context):
 
             ai_response = handle_conversational_question(user_message, context)
             return jsonify({
@@ -180,7 +172,7 @@ def process_chat_message():
             products = get_realistic_products(search_query)
             
             # Generate search response
-            ai_response = f"Great! I found some excellent {search_query} for you. Here are my top recommendations based on customer ratings, reviews, and market trends:"
+            ai_response = _search_reply(search_query)
             
             return jsonify({
                 'ai_response': ai_response,
@@ -194,6 +186,68 @@ def process_chat_message():
 
         return jsonify({'error': str(e)}), 500
 
+@chat_bp.route('/process/stream', methods=['POST'])
+def process_chat_message_stream():
+    """Same reply as /process, as Server-Sent Events
+    
+    ``ack`` carries the reply text and goes out before any product is
+    looked up, each ``product`` event carries one card as soon as it is
+    resolved, and ``done`` closes the stream with the fields /process
+    returns besides the reply and products.
+    """
+    try:
+        user_message, context = _parse_chat_request(request.get_json(silent=True))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not user_message:
+        return jsonify({'error': 'Message is required'}), 400
+    
+    return event_stream(_chat_events(user_message, context))
+
+def _chat_events(user_message, context):
+    if _is_follow_up(user_message, context):
+        yield 'ack', {'ai_response': handle_conversational_question(user_message, context)}
+        products = context.get('lastProducts', [])[:6]
+        for index, product in enumerate(products):
+            yield 'product', {'index': index, 'product': product}
+        yield 'done', {'count': len(products), 'should_search': False, 'is_conversational': True}
+        return
+    
+    # The reply only depends on the query, so it goes out before the product lookup
+    search_query = extract_search_terms(user_message)
+    yield 'ack', {'ai_response': _search_reply(search_query), 'search_query': search_query}
+    
+    count = 0
+    for index, product in enumerate(get_realistic_products(search_query)):
+        if not product.get('image'):
+            product['image'] = image_service.get_product_image(product.get('title', ''), search_query)
+        yield 'product', {'index': index, 'product': product}
+        count += 1
+    yield 'done', {
+        'count': count,
+        'should_search': True,
+        'is_conversational': False,
+        'search_query': search_query
+    }
+
+def _parse_chat_request(data):
+    """``(message, context)`` from either request format: a bare string or an object"""
+    if isinstance(data, str):
+        return data.strip(), {}
+    data = data or {}
+    return data.get('message', '').strip(), data.get('context', {})
+
+def _is_follow_up(user_message, context):
+    """A question about the products shown last, rather than a new search"""
+    user_lower = user_message.lower()
+    return bool(context.get('lastProducts')) and any(
+        word in user_lower for word in ['why', 'how', 'what', 'these', 'them', 'explain']
+    )
+
+def _search_reply(search_query):
+    return f"Great! I found some excellent {search_query} for you. Here are my top recommendations based on customer ratings, reviews, and market trends:"
+
 def handle_conversational_question(user_message, context):
     """Handle conversational questions about previous results"""
     user_lower = user_message.lower()
@@ -480,9 +534,11 @@ def get_realistic_products(search_query):
     # Find matching products
     search_lower = search_query.lower()
     
-    # Direct match first
-    if search_lower in product_db:
-        products = product_db[search_lower]
+    # Direct match first, on canonical keys so case, spacing and word order don't matter
+    search_key = normalize_query(search_query).key
+    category_keys = {normalize_query(category).key: category for category in product_db}
+    if search_key in category_keys:
+        products = product_db[category_keys[search_key]]
     else:
         # Try partial matches
         products = []
@@ -1,7 +1,16 @@
 from flask import Blueprint, jsonify
 from app.services.scraper import MarketplaceScraper
-from app.services.trends import TrendsAnalyzer
 from app.models.product import Product
+from app.services.http_client import http_client
+from app.services.rate_limiter import rate_limiter
+from app.services.single_flight import single_flight
+from app.services.revalidator import revalidator
+from app.services.openai_client import openai_client
+from app.services.prewarm import prewarm_scheduler
+from app.services.trends_sessions import trends_session_pool
+from app.models.product_writer import get_product_writer
+from app.models.search_cache import get_cache_maintenance, get_memory_cache
+from app.models.trends_cache import get_trends_cache
 
 health_bp = Blueprint('health', __name__)
 
@@ -33,6 +42,8 @@ def test_services():
     
     # Test trends
     try:
+        # Imported on first use: pandas, numpy and pytrends stay out of worker startup
+        from app.services.trends import TrendsAnalyzer
         analyzer = TrendsAnalyzer()
         test_trends = analyzer._generate_mock_trend_data(['test'])
         results['trends'] = 'working' if test_trends.get('keywords') else 'failed'
@@ -50,4 +61,29 @@ def test_services():
     return jsonify({
         'status': 'test_complete',
         'services': results
-    })
\ No newline at end of file
+    })
+
+@health_bp.route('/stats', methods=['GET'])
+def service_stats():
+    """Runtime statistics for shared outbound resources"""
+    # Imported here: the history store pulls in numpy
+    from app.models.trends_series import get_trends_series_store
+    return jsonify({
+        'http_client': http_client.get_stats(),
+        'rate_limiter': rate_limiter.get_stats(),
+        'product_writer': get_product_writer(Product().db_path).get_stats(),
+        'search_cache': get_cache_maintenance().get_stats(),
+        'memory_cache': get_memory_cache().get_stats(),
+        'trends_cache': get_trends_cache().get_stats(),
+        'trends_history': get_trends_series_store().get_stats(),
+        'trends_sessions': trends_session_pool.get_stats(),
+        'single_flight': single_flight.get_stats(),
+        'revalidator': revalidator.get_stats(),
+        'openai': openai_client.get_stats()
+    })
+
+
+@health_bp.route('/prewarm/status', methods=['GET'])
+def prewarm_status():
+    """Pre-warm scheduler state: the warm set and when each entry was last refreshed"""
+    return jsonify(prewarm_scheduler.get_status())
\ No newline at end of file
@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify
 from app.services.scraper import MarketplaceScraper
-from app.models.product import Product
-import json
+from app.services.product_search import product_search
 
+search_bp = Blueprint('search', __name__)
 
 @search_bp.route('/products', methods=['POST'])
 def search_products():
@@ -17,47 +17,19 @@ def search_products():
         if not query:
             return jsonify({'error': 'Query is required'}), 400
         
-        
-        scraper = MarketplaceScraper()
-        product_model = Product()
-        all_products = []
-        
-        # Check cache first
-        for platform in platforms:
-            cached_results = product_model.get_cached_results(query, platform)
-            if cached_results:
-                cached_products = json.loads(cached_results)
-                all_products.extend(cached_products)
-                continue
-            
-            
-            # Scrape fresh data
-            if platform.lower() == 'amazon':
-                products = scraper.search_amazon(query, max_results)
-            elif platform.lower() == 'ebay':
-                products = scraper.search_ebay(query, max_results)
-            else:
-                continue
-            
-            
-            # Save to database and cache
-            for product in products:
-                try:
-                    product_model.save_product(product)
-                except Exception as e:
-            
-            try:
-                product_model.cache_results(query, platform, json.dumps(products))
-            except Exception as e:
-                
-            all_products.extend(products)
-        
+        # Platforms are searched concurrently; slow ones come back as partial
+        result = product_search.search(query, platforms, max_results)
+        all_products = result['products']
         
         return jsonify({
             'query': query,
             'total_results': len(all_products),
             'products': all_products,
-            'platforms_searched': platforms
+            'platforms_searched': platforms,
+            'partial': bool(result['partial_platforms']),
+            'partial_platforms': result['partial_platforms'],
+            'stale': bool(result['stale_platforms']),
+            'stale_platforms': result['stale_platforms']
         })
         
     except Exception as e:
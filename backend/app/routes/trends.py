@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from app.services.trends import TrendsAnalyzer
+from config import Config
 
 # keep same blueprint name to avoid changing route registration elsewhere
 trends_bp = Blueprint('trends', __name__)
@@ -25,6 +25,8 @@ def analyze_trends():
         # Limit to 5 keywords
         keywords = keywords[:5]
         
+        # Imported on first use: pandas, numpy and pytrends stay out of worker startup
+        from app.services.trends import TrendsAnalyzer
         analyzer = TrendsAnalyzer()
         trend_data = analyzer.get_trend_data(keywords, timeframe)
         
@@ -53,9 +55,11 @@ def compare_keywords():
         if len(keywords) < 2:
             return jsonify({'error': 'At least 2 keywords required for comparison'}), 400
         
-        # optional: limit keywords to a manageable number
-        keywords = keywords[:10]
+        # More than 5 keywords are fetched in parallel groups and rescaled onto one scale
+        keywords = keywords[:Config.TRENDS_MAX_KEYWORDS]
         
+        # Imported on first use: pandas, numpy and pytrends stay out of worker startup
+        from app.services.trends import TrendsAnalyzer
         analyzer = TrendsAnalyzer()
         trend_data = analyzer.get_trend_data(keywords, timeframe)
         
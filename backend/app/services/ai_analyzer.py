@@ -1,24 +1,38 @@
-import openai
-from textblob import TextBlob
 from typing import List, Dict
 import os
 
+from config import Config
+from app.services.openai_client import openai_client
+
 class AIAnalyzer:
     def __init__(self):
         self.openai_key = os.getenv('OPENAI_API_KEY')
-        if self.openai_key:
-            openai.api_key = self.openai_key
     
-    def analyze_products(self, products: List[Dict], trend_data: Dict = None) -> Dict:
-        """Analyze products and generate insights"""
+    def analyze_products(self, products: List[Dict], trend_data: Dict = None, opportunity_score: int = None) -> Dict:
+        """Analyze products and generate insights
+        
+        A score computed beforehand (see ``opportunity_score``) is reported
+        as is, so the analysis agrees with it even when it falls back.
+        """
         try:
             if self.openai_key:
-                return self._analyze_with_openai(products, trend_data)
+                analysis = self._analyze_with_openai(products, trend_data)
             else:
-                return self._analyze_with_textblob(products, trend_data)
+                analysis = self._analyze_with_textblob(products, trend_data)
         except Exception as e:
             print(f"Error in AI analysis: {e}")
-            return self._fallback_analysis(products, trend_data)
+            analysis = self._fallback_analysis(products, trend_data)
+        if opportunity_score is not None:
+            analysis['opportunity_score'] = opportunity_score
+        return analysis
+    
+    def opportunity_score(self, products: List[Dict], trend_data: Dict = None) -> int:
+        """Opportunity score for a report, neutral if it cannot be calculated"""
+        try:
+            return self._calculate_opportunity_score(products, trend_data)
+        except Exception as e:
+            print(f"Error calculating opportunity score: {e}")
+            return 50
     
     def _analyze_with_openai(self, products: List[Dict], trend_data: Dict = None) -> Dict:
         """Use OpenAI GPT for analysis"""
@@ -46,18 +60,16 @@ class AIAnalyzer:
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            # Bounded by the client's deadline, in-flight cap and token budget
+            analysis = openai_client.complete(
+                [
                     {"role": "system", "content": "You are a market research analyst specializing in e-commerce product opportunities."},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=1000,
+                max_tokens=Config.OPENAI_MAX_TOKENS,
                 temperature=0.7
             )
             
-            analysis = response.choices[0].message.content
-            
             return {
                 'analysis_type': 'openai',
                 'summary': analysis,
@@ -65,6 +77,9 @@ class AIAnalyzer:
                 'key_insights': self._extract_key_insights(analysis)
             }
             
+        except TimeoutError as e:
+            print(f"OpenAI analysis timed out, using local analysis: {e}")
+            return self._analyze_with_textblob(products, trend_data)
         except Exception as e:
             print(f"OpenAI analysis failed: {e}")
             return self._analyze_with_textblob(products, trend_data)
@@ -0,0 +1,111 @@
+"""
+Per-process background threads for the services' maintenance jobs
+"""
+import atexit
+import os
+import threading
+import time
+import weakref
+from typing import Callable
+
+# Interpreter exit waits at most this long for all threads together
+SHUTDOWN_TIMEOUT = 5.0
+
+# Weak, so owners created for a benchmark or a single database can go away
+_threads = weakref.WeakSet()
+_threads_lock = threading.Lock()
+
+
+class BackgroundThread:
+    """A daemon thread started on first use in every process
+
+    Owners call ``ensure_started()`` whenever they need the thread; once it
+    runs that is a cheap check. A forked worker inherits the object but not
+    the thread, so the first call in the child starts a new one, after
+    ``on_start`` has reset any state the old thread owned. ``stop()`` and
+    interpreter exit set ``stopping``, call ``on_stop`` and wait for the
+    thread, so targets that watch ``stopping`` can finish their work.
+    """
+
+    def __init__(self, name: str, target: Callable[[], None],
+                 on_start: Callable[[], None] = None, on_stop: Callable[[], None] = None):
+        self.name = name
+        self.target = target
+        self.on_start = on_start
+        self.on_stop = on_stop
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.pid = None
+        with _threads_lock:
+            _threads.add(self)
+
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive() and self.pid == os.getpid()
+
+    def ensure_started(self):
+        if self.running():
+            return
+        with self.lock:
+            if self.running():
+                return
+            self.pid = os.getpid()
+            self.stopping.clear()
+            if self.on_start is not None:
+                self.on_start()
+            self.thread = threading.Thread(target=self.target, name=self.name, daemon=True)
+            self.thread.start()
+
+    def request_stop(self):
+        if not self.running():
+            return
+        self.stopping.set()
+        if self.on_stop is not None:
+            self.on_stop()
+
+    def stop(self, timeout: float = SHUTDOWN_TIMEOUT):
+        """Ask the thread to finish and wait up to ``timeout`` seconds for it"""
+        if not self.running():
+            return
+        self.request_stop()
+        self.thread.join(timeout)
+
+
+class PeriodicJob(BackgroundThread):
+    """Runs ``job`` every ``interval()`` seconds in a background thread
+
+    An error is logged and the next run goes ahead as scheduled. The first
+    run waits one interval unless ``run_first`` is set. ``interval`` is read
+    before every wait, so owners can change it on the fly.
+    """
+
+    def __init__(self, name: str, job: Callable[[], object], interval: Callable[[], float],
+                 description: str, run_first: bool = False):
+        super().__init__(name, self._loop)
+        self.job = job
+        self.interval = interval
+        self.description = description
+        self.run_first = run_first
+
+    def _loop(self):
+        if not self.run_first and self.stopping.wait(self.interval()):
+            return
+        while True:
+            try:
+                self.job()
+            except Exception as e:
+                print(f"Error during {self.description}: {e}")
+            if self.stopping.wait(self.interval()):
+                return
+
+
+@atexit.register
+def _stop_all():
+    """Let every running thread of this process wind down at interpreter exit"""
+    with _threads_lock:
+        threads = [thread for thread in _threads if thread.running()]
+    for thread in threads:
+        thread.request_stop()
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    for thread in threads:
+        thread.thread.join(max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,38 @@
+"""
+Server-Sent Events responses for endpoints that deliver their result in parts
+"""
+import json
+import time
+from typing import Dict, Iterable, Tuple
+
+from flask import Response, stream_with_context
+
+
+def sse_event(event: str, data: Dict) -> str:
+    """One SSE frame; ``data`` is sent as a single line of JSON"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def event_stream(events: Iterable[Tuple[str, Dict]]) -> Response:
+    """Stream ``(event, data)`` pairs as they are produced
+
+    Every frame is flushed as soon as it is yielded, so clients see the
+    first event while later ones are still being computed. Each event gets
+    ``elapsed_ms`` since the stream started. An exception mid-stream ends
+    it with an ``error`` event, since the status code has already gone out.
+    """
+    def generate():
+        started = time.perf_counter()
+        try:
+            for event, data in events:
+                data = dict(data, elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+                yield sse_event(event, data)
+        except Exception as e:
+            print(f"Error while streaming response: {e}")
+            yield sse_event('error', {'error': str(e)})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop nginx-style proxies from buffering the stream into one response
+        'X-Accel-Buffering': 'no'
+    })
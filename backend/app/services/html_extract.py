@@ -0,0 +1,479 @@
+"""
+Extraction of product data from marketplace search result pages
+
+Two interchangeable backends are provided:
+
+- ``LxmlBackend`` parses with libxml2 and evaluates CSS selectors that were
+  compiled to XPath once, at import time.
+- ``SoupBackend`` is the original BeautifulSoup/html.parser path and is used
+  when lxml is unavailable or ``SCRAPER_PARSER=bs4``.
+
+Both feed the same per-platform field extraction, so they produce identical
+product dicts. On synthetic 1.6 MB result pages with 60 containers
+(``benchmarks/bench_parsers.py``), extracting 20 products took ~28 ms with
+lxml against ~760 ms with BeautifulSoup on Amazon (27x), and ~57 ms against
+~860 ms on eBay (15x).
+
+``extract_products_streaming`` additionally consumes the response body in
+chunks, only materialises result containers and stops reading once enough
+products are extracted.
+"""
+import re
+from typing import Iterable, List, Dict, Optional, Tuple
+
+from config import Config
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    etree = None
+
+
+# Selector fallbacks per platform, tried in order
+AMAZON_SELECTORS = {
+    'containers': [
+        'div[data-component-type="s-search-result"]',
+        '.s-result-item',
+        '[data-asin]'
+    ],
+    'title': [
+        'h2 a span',
+        '.a-size-medium span',
+        '.a-size-base-plus',
+        'h2 span'
+    ],
+    'price': [
+        '.a-price-whole',
+        '.a-offscreen',
+        '.a-price .a-offscreen'
+    ],
+    'rating': ['.a-icon-alt'],
+    'reviews': ['.a-size-base'],
+    'link': ['h2 a']
+}
+
+EBAY_SELECTORS = {
+    'containers': [
+        '.s-item__wrapper',
+        '.s-item',
+        '[data-view="mi:1686"]'
+    ],
+    'sponsored': ['.s-item__title--tag'],
+    'title': [
+        '.s-item__title span',
+        '.s-item__title',
+        'h3 span'
+    ],
+    'price': [
+        '.s-item__price .notranslate',
+        '.s-item__price',
+        '.s-item__detail--primary .s-item__price'
+    ],
+    'link': ['.s-item__link']
+}
+
+
+_SIMPLE_SELECTOR = re.compile(
+    r'(?P<tag>[a-zA-Z][a-zA-Z0-9]*)'
+    r'|\.(?P<cls>[-\w]+)'
+    r'|\[(?P<attr>[-\w]+)(?:="(?P<value>[^"]*)")?\]'
+)
+
+
+def css_to_xpath(selector: str, prefix: str = 'descendant::') -> str:
+    """Translate the CSS subset used by our selectors into an XPath expression
+
+    Supports tag names, ``.class``, ``[attr]``, ``[attr="value"]``, compound
+    selectors and the descendant combinator.
+    """
+    steps = []
+    for part in selector.split():
+        tag = '*'
+        predicates = []
+        pos = 0
+        while pos < len(part):
+            match = _SIMPLE_SELECTOR.match(part, pos)
+            if not match:
+                raise ValueError(f"Unsupported selector: {selector}")
+            if match.group('tag'):
+                tag = match.group('tag').lower()
+            elif match.group('cls'):
+                predicates.append(
+                    f"contains(concat(' ', normalize-space(@class), ' '), ' {match.group('cls')} ')"
+                )
+            elif match.group('value') is not None:
+                predicates.append(f"@{match.group('attr')}=\"{match.group('value')}\"")
+            else:
+                predicates.append(f"@{match.group('attr')}")
+            pos = match.end()
+        step = tag + ''.join(f'[{p}]' for p in predicates)
+        steps.append(step)
+    return prefix + '/descendant::'.join(steps)
+
+
+def css_to_matcher(selector: str):
+    """Compile a single compound selector into an element predicate
+
+    Used by the streaming parser, which sees start tags one at a time and so
+    can only match selectors without combinators.
+    """
+    if len(selector.split()) != 1:
+        raise ValueError(f"Streaming matcher needs a simple selector: {selector}")
+
+    tag = None
+    classes = []
+    attrs = []
+    for match in _SIMPLE_SELECTOR.finditer(selector):
+        if match.group('tag'):
+            tag = match.group('tag').lower()
+        elif match.group('cls'):
+            classes.append(match.group('cls'))
+        else:
+            attrs.append((match.group('attr'), match.group('value')))
+
+    def matches(element_tag: str, attrib) -> bool:
+        if tag and element_tag.lower() != tag:
+            return False
+        if classes:
+            element_classes = (attrib.get('class') or '').split()
+            if any(cls not in element_classes for cls in classes):
+                return False
+        for name, value in attrs:
+            if name not in attrib or (value is not None and attrib[name] != value):
+                return False
+        return True
+
+    return matches
+
+
+class SoupBackend:
+    """BeautifulSoup backend, kept as the reference implementation"""
+
+    name = 'bs4'
+
+    def parse(self, content):
+        # Imported on first use: the lxml backend is the default
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(content, 'html.parser')
+
+    def select(self, node, selector: str) -> List:
+        return node.select(selector)
+
+    def first(self, node, selector: str):
+        return node.select_one(selector)
+
+    def text(self, element) -> str:
+        return element.get_text()
+
+    def attr(self, element, name: str) -> str:
+        return element[name]
+
+
+class LxmlBackend:
+    """lxml backend evaluating selectors pre-compiled to XPath"""
+
+    name = 'lxml'
+
+    def __init__(self, selector_sets: List[Dict[str, List[str]]]):
+        # Marketplace pages are served as UTF-8; without this libxml2 would
+        # assume Latin-1 for byte input that lacks a charset declaration
+        self.byte_parser = etree.HTMLParser(encoding='utf-8')
+        self.text_parser = etree.HTMLParser()
+        self._text = etree.XPath('.//text()[not(parent::script) and not(parent::style)]')
+        self.compiled = {}
+        for selectors in selector_sets:
+            for selector_list in selectors.values():
+                for selector in selector_list:
+                    self.compile(selector)
+
+    def compile(self, selector: str):
+        """Compile a selector once; later lookups reuse the XPath object"""
+        compiled = self.compiled.get(selector)
+        if compiled is None:
+            compiled = (
+                etree.XPath(css_to_xpath(selector)),
+                etree.XPath(f'({css_to_xpath(selector)})[1]')
+            )
+            self.compiled[selector] = compiled
+        return compiled
+
+    def parse(self, content):
+        parser = self.byte_parser if isinstance(content, bytes) else self.text_parser
+        return etree.fromstring(content, parser)
+
+    def select(self, node, selector: str) -> List:
+        if node is None:
+            return []
+        return self.compile(selector)[0](node)
+
+    def first(self, node, selector: str):
+        matches = self.compile(selector)[1](node)
+        return matches[0] if matches else None
+
+    def text(self, element) -> str:
+        return ''.join(self._text(element))
+
+    def attr(self, element, name: str) -> str:
+        return element.attrib[name]
+
+
+def _first_text(backend, container, selectors: List[str]) -> Optional[str]:
+    for selector in selectors:
+        element = backend.first(container, selector)
+        if element is not None:
+            return backend.text(element)
+    return None
+
+
+def extract_amazon_product(backend, container, query: str) -> Optional[Dict]:
+    """Build an Amazon product dict from one result container"""
+    title = _first_text(backend, container, AMAZON_SELECTORS['title'])
+    title = title.strip() if title is not None else None
+    if not title:
+        return None
+
+    # Try to get price
+    price = 0
+    for selector in AMAZON_SELECTORS['price']:
+        price_elem = backend.first(container, selector)
+        if price_elem is not None:
+            price_text = backend.text(price_elem).replace('$', '').replace(',', '')
+            try:
+                price = float(price_text.split()[0])
+                break
+            except:
+                continue
+
+    # Try to get rating
+    rating = 0
+    rating_text = _first_text(backend, container, AMAZON_SELECTORS['rating'])
+    if rating_text is not None:
+        try:
+            rating = float(rating_text.split()[0])
+        except:
+            pass
+
+    # Try to get reviews count
+    reviews_count = 0
+    reviews_text = _first_text(backend, container, AMAZON_SELECTORS['reviews'])
+    if reviews_text is not None:
+        try:
+            reviews_count = int(''.join(filter(str.isdigit, reviews_text.replace(',', ''))))
+        except:
+            pass
+
+    # Get product URL
+    link_elem = backend.first(container, AMAZON_SELECTORS['link'][0])
+    product_url = f"https://www.amazon.com{backend.attr(link_elem, 'href')}" if link_elem is not None else ""
+
+    return {
+        'title': title,
+        'price': price,
+        'rating': rating,
+        'reviews_count': reviews_count,
+        'platform': 'Amazon',
+        'url': product_url,
+        'search_query': query,
+        'seller': 'Amazon Seller'
+    }
+
+
+def extract_ebay_product(backend, container, query: str) -> Optional[Dict]:
+    """Build an eBay product dict from one result container"""
+    # Skip sponsored items
+    if backend.first(container, EBAY_SELECTORS['sponsored'][0]) is not None:
+        return None
+
+    title = None
+    for selector in EBAY_SELECTORS['title']:
+        title_elem = backend.first(container, selector)
+        if title_elem is not None:
+            title = backend.text(title_elem).strip()
+            if title and title != "Shop on eBay":
+                break
+
+    if not title or title == "Shop on eBay":
+        return None
+
+    # Try to get price
+    price = 0
+    for selector in EBAY_SELECTORS['price']:
+        price_elem = backend.first(container, selector)
+        if price_elem is not None:
+            price_text = backend.text(price_elem).replace('$', '').replace(',', '')
+            try:
+                # Handle price ranges like "$10.99 to $15.99"
+                if 'to' in price_text:
+                    price_text = price_text.split('to')[0].strip()
+                price = float(price_text.split()[0])
+                break
+            except:
+                continue
+
+    # Get product URL
+    link_elem = backend.first(container, EBAY_SELECTORS['link'][0])
+    product_url = backend.attr(link_elem, 'href') if link_elem is not None else ""
+
+    return {
+        'title': title,
+        'price': price,
+        'rating': 0,  # eBay doesn't show ratings in search results
+        'reviews_count': 0,
+        'platform': 'eBay',
+        'url': product_url,
+        'search_query': query
+    }
+
+
+PLATFORMS = {
+    'amazon': (AMAZON_SELECTORS, extract_amazon_product),
+    'ebay': (EBAY_SELECTORS, extract_ebay_product),
+}
+
+
+def get_backend(name: str = None):
+    """Return the configured extraction backend, falling back to BeautifulSoup"""
+    name = (name or Config.SCRAPER_PARSER).lower()
+    if name == 'lxml' and _lxml_backend is not None:
+        return _lxml_backend
+    return _soup_backend
+
+
+def extract_products(content, platform: str, query: str, max_results: int, backend=None) -> Optional[List[Dict]]:
+    """Extract up to ``max_results`` products from a result page
+
+    Returns ``None`` when no result containers are found at all, so callers
+    can tell an unrecognised page from one with no usable products.
+    """
+    backend = backend or get_backend()
+    selectors, extract = PLATFORMS[platform.lower()]
+    document = backend.parse(content)
+
+    containers = []
+    for selector in selectors['containers']:
+        containers = backend.select(document, selector)
+        if containers:
+            break
+
+    if not containers:
+        return None
+
+    products = []
+    for container in containers[:max_results]:
+        try:
+            product = extract(backend, container, query)
+        except Exception:
+            continue
+        if product:
+            products.append(product)
+
+    return products
+
+
+class _ContainerTarget:
+    """lxml parser target that only builds trees for result containers
+
+    Everything outside a container is dropped as it streams past; each
+    finished container subtree is handed to ``on_container`` immediately.
+    """
+
+    def __init__(self, matcher, on_container):
+        self.matcher = matcher
+        self.on_container = on_container
+        self.builder = None
+        self.depth = 0
+
+    def start(self, tag, attrib):
+        if self.builder is None:
+            if not self.matcher(tag, attrib):
+                return
+            self.builder = etree.TreeBuilder()
+        self.depth += 1
+        self.builder.start(tag, dict(attrib))
+
+    def end(self, tag):
+        if self.builder is None:
+            return
+        self.builder.end(tag)
+        self.depth -= 1
+        if self.depth == 0:
+            container = self.builder.close()
+            self.builder = None
+            self.on_container(container)
+
+    def data(self, data):
+        if self.builder is not None:
+            self.builder.data(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return None
+
+
+def streaming_supported() -> bool:
+    return _lxml_backend is not None
+
+
+def extract_products_streaming(chunks: Iterable[bytes], platform: str, query: str, max_results: int,
+                               max_bytes: int = None) -> Tuple[Optional[List[Dict]], int]:
+    """Extract products from a response body as it is downloaded
+
+    Reading stops as soon as ``max_results`` products have been extracted or
+    ``max_bytes`` have been read. Only result containers matching the
+    platform's primary container selector are materialised; if none are seen,
+    the bytes read so far are parsed normally so the fallback selectors still
+    apply. Returns the products (``None`` for an unrecognised page) and the
+    number of bytes consumed.
+    """
+    max_bytes = max_bytes or Config.SCRAPER_MAX_BYTES
+    selectors, extract = PLATFORMS[platform.lower()]
+    backend = _lxml_backend
+    products = []
+    containers_seen = [0]
+
+    def on_container(container):
+        containers_seen[0] += 1
+        if len(products) >= max_results:
+            return
+        try:
+            product = extract(backend, container, query)
+        except Exception:
+            return
+        if product:
+            products.append(product)
+
+    target = _ContainerTarget(_container_matchers[platform.lower()], on_container)
+    parser = etree.HTMLParser(target=target, encoding='utf-8')
+
+    received = []
+    bytes_read = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        chunk = chunk[:max_bytes - bytes_read]
+        received.append(chunk)
+        bytes_read += len(chunk)
+        parser.feed(chunk)
+        if len(products) >= max_results or bytes_read >= max_bytes:
+            break
+
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        pass
+
+    if not containers_seen[0]:
+        return extract_products(b''.join(received), platform, query, max_results, backend=backend), bytes_read
+
+    return products[:max_results], bytes_read
+
+
+_soup_backend = SoupBackend()
+# Selectors are compiled here, once per process
+_lxml_backend = LxmlBackend([AMAZON_SELECTORS, EBAY_SELECTORS]) if etree is not None else None
+_container_matchers = {
+    platform: css_to_matcher(selectors['containers'][0])
+    for platform, (selectors, _) in PLATFORMS.items()
+}
@@ -0,0 +1,152 @@
+"""
+Process-wide pooled HTTP client shared by the scraper layer
+"""
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, TYPE_CHECKING
+
+from config import Config
+from app.services.rate_limiter import rate_limiter
+
+if TYPE_CHECKING:
+    import requests
+
+RETRY_STATUSES = (502, 503, 504)
+RETRY_METHODS = ('GET', 'HEAD')
+
+
+def retry_after(response: 'requests.Response') -> Optional[float]:
+    """Seconds the server asked us to wait, from ``Retry-After`` (delta or HTTP date)"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPClient:
+    """One long-lived ``requests.Session`` with connection pools sized per host
+
+    Keep-alive connections, TLS sessions and resolved addresses survive
+    across API calls, so repeated searches skip the TCP and TLS handshakes.
+    The session (and ``requests`` itself) is created on first use, keeping
+    it out of worker startup.
+    """
+
+    def __init__(self, pool_connections: int = None, pool_maxsize: int = None,
+                 host_pool_sizes: Dict[str, int] = None):
+        self.pool_connections = pool_connections or Config.HTTP_POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or Config.HTTP_POOL_MAXSIZE
+        self.host_pool_sizes = host_pool_sizes if host_pool_sizes is not None else Config.HTTP_HOST_POOL_SIZES
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self._session = None
+
+    @property
+    def session(self) -> 'requests.Session':
+        if self._session is None:
+            with self.lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _adapter(self, maxsize: int):
+        from requests.adapters import HTTPAdapter
+        return HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=maxsize,
+            # Retries happen in request(), where each attempt takes a rate-limit token
+            max_retries=0,
+            pool_block=False
+        )
+
+    def _build_session(self) -> 'requests.Session':
+        import requests
+        session = requests.Session()
+        session.mount('https://', self._adapter(self.pool_maxsize))
+        session.mount('http://', self._adapter(self.pool_maxsize))
+
+        # Hosts we hit hard get their own, larger pools
+        for host, maxsize in self.host_pool_sizes.items():
+            session.mount(f'https://{host}', self._adapter(maxsize))
+
+        return session
+
+    def request(self, method: str, url: str, rate_limit: bool = True, **kwargs) -> 'requests.Response':
+        """Send a request through the shared pools, honouring the host rate limit
+
+        GET and HEAD requests that fail to connect or get a 502/503/504 are
+        retried up to ``HTTP_MAX_RETRIES`` times with exponential backoff.
+        Every attempt takes its own rate-limit token and waits at least as
+        long as the host's ``Retry-After`` asks; a host that asks for more
+        than ``HTTP_MAX_RETRY_AFTER`` seconds gets its response returned as is.
+        """
+        import requests
+        retries = Config.HTTP_MAX_RETRIES if method.upper() in RETRY_METHODS else 0
+        for attempt in range(retries + 1):
+            if rate_limit:
+                rate_limiter.acquire(url)
+            with self.lock:
+                self.request_count += 1
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.ConnectionError:
+                if attempt == retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            delay = max(self._backoff(attempt), retry_after(response) or 0.0)
+            if delay > Config.HTTP_MAX_RETRY_AFTER:
+                return response
+            response.close()
+            time.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return Config.HTTP_BACKOFF_FACTOR * (2 ** attempt)
+
+    def get(self, url: str, **kwargs) -> 'requests.Response':
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> 'requests.Response':
+        return self.request('HEAD', url, **kwargs)
+
+    def get_stats(self) -> Dict:
+        """Connection reuse per host: requests sent vs. connections opened"""
+        hosts = {}
+        # No session yet means no requests yet; don't create one just to report that
+        session = self._session
+        adapters = {id(adapter): adapter for adapter in session.adapters.values()} if session else {}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                stats = hosts.setdefault(pool.host, {'requests': 0, 'connections_opened': 0})
+                stats['requests'] += pool.num_requests
+                stats['connections_opened'] += pool.num_connections
+
+        for stats in hosts.values():
+            stats['connections_reused'] = max(0, stats['requests'] - stats['connections_opened'])
+
+        return {
+            'requests': self.request_count,
+            'pool_connections': self.pool_connections,
+            'pool_maxsize': self.pool_maxsize,
+            'hosts': hosts
+        }
+
+
+# Global instance
+http_client = HTTPClient()
@@ -1,9 +1,9 @@
 """
 Image service for fetching real product images
 """
-import requests
 import hashlib
 from typing import Dict, Optional
+from app.services.http_client import http_client
 
 class ProductImageService:
     """Service for getting high-quality product images"""
@@ -91,7 +91,7 @@ class ProductImageService:
     def validate_image_url(self, url: str) -> bool:
         """Validate if image URL is accessible"""
         try:
-            response = requests.head(url, timeout=5)
+            response = http_client.head(url, rate_limit=False, timeout=5)
             return response.status_code == 200
         except:
             return False
@@ -0,0 +1,198 @@
+"""
+Async OpenAI chat completions with an in-flight cap, deadlines and a token budget
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List
+
+from config import Config
+from app.services.background import BackgroundThread
+from app.services.rate_limiter import TokenBucket
+
+# Rough prompt size used to reserve budget before the API reports real usage
+CHARS_PER_TOKEN = 4
+# A call that reaches the front of the queue with less time left is not sent
+MIN_CALL_TIME = 0.1
+
+
+def estimate_tokens(messages: List[Dict], max_tokens: int) -> int:
+    """Upper-bound guess of a call's total tokens: the prompt plus the full completion"""
+    prompt = sum(len(message.get('content') or '') for message in messages)
+    return prompt // CHARS_PER_TOKEN + len(messages) * 4 + max_tokens
+
+
+class AsyncCompletionClient:
+    """Chat completions on one background event loop shared by all request threads
+
+    A blocking SDK call held a worker thread for the whole generation with
+    no timeout. Here every call runs on the client's own loop: at most
+    ``OPENAI_MAX_IN_FLIGHT`` are sent at once, each reserves its estimated
+    tokens from a bucket refilled at ``OPENAI_TOKENS_PER_MINUTE`` (so
+    bursts queue instead of hitting the API's rate limit), and the whole
+    call, queueing included, is bounded by a deadline. Callers get
+    ``TimeoutError`` at the deadline and fall back to local analysis.
+
+    ``OPENAI_BASE_URL`` points the client at another server, such as a
+    local fake for testing.
+    """
+
+    def __init__(self, api_key: str = None, base_url: str = None, model: str = None,
+                 max_in_flight: int = None, timeout: float = None,
+                 tokens_per_minute: float = None, token_burst: float = None):
+        self.api_key = api_key or Config.OPENAI_API_KEY
+        self.base_url = base_url or Config.OPENAI_BASE_URL
+        self.model = model or Config.OPENAI_MODEL
+        self.max_in_flight = max_in_flight or Config.OPENAI_MAX_IN_FLIGHT
+        self.timeout = timeout or Config.OPENAI_TIMEOUT
+        tokens_per_minute = tokens_per_minute or Config.OPENAI_TOKENS_PER_MINUTE
+        self.budget = TokenBucket(tokens_per_minute / 60.0, token_burst or Config.OPENAI_TOKEN_BURST)
+        self.lock = threading.Lock()
+        self.loop = None
+        self.worker = BackgroundThread('openai-client', lambda: self.loop.run_forever(),
+                                       on_start=self._new_loop, on_stop=self._stop_loop)
+        # Bound to the loop, so created on it at first use
+        self.client = None
+        self.semaphore = None
+        self.in_flight = 0
+        self.stats = {
+            'calls': 0, 'completed': 0, 'failed': 0, 'timeouts': 0,
+            'budget_waits': 0, 'over_budget': 0, 'tokens_used': 0, 'max_in_flight_seen': 0
+        }
+
+    def _count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def ensure_started(self):
+        self.worker.ensure_started()
+
+    def _new_loop(self):
+        # The loop, and the client and semaphore bound to it, belong to the thread being started
+        self.loop = asyncio.new_event_loop()
+        self.client = None
+        self.semaphore = None
+
+    def _stop_loop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def _ensure_client(self):
+        if self.client is None:
+            # Imported on first use; the SDK is slow to import and only needed with a key
+            import httpx
+            from openai import AsyncOpenAI
+            self.semaphore = asyncio.Semaphore(self.max_in_flight)
+            self.client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url or None,
+                # Deadlines replace the SDK's retries: a retry would only run past them
+                max_retries=0,
+                # Passing our own httpx client also sidesteps the SDK's proxies argument, which newer httpx rejects
+                http_client=httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=self.max_in_flight,
+                                        max_keepalive_connections=self.max_in_flight)
+                )
+            )
+        return self.client
+
+    def complete(self, messages: List[Dict], max_tokens: int = None, temperature: float = 0.7,
+                 timeout: float = None) -> str:
+        """Blocking completion for request threads; raises ``TimeoutError`` at the deadline"""
+        self.ensure_started()
+        timeout = timeout or self.timeout
+        future = asyncio.run_coroutine_threadsafe(
+            self.acomplete(messages, max_tokens, temperature, timeout), self.loop
+        )
+        try:
+            # The coroutine enforces the deadline; the margin only covers loop scheduling
+            return future.result(timeout=timeout + 1.0)
+        except FutureTimeoutError:
+            if future.done():
+                # The coroutine's own deadline or budget error
+                raise
+            future.cancel()
+            self._count('timeouts')
+            raise TimeoutError(f"OpenAI completion exceeded {timeout:.1f}s")
+
+    async def acomplete(self, messages: List[Dict], max_tokens: int = None, temperature: float = 0.7,
+                        timeout: float = None) -> str:
+        """Completion text for ``messages``; must run on the client's loop"""
+        timeout = timeout or self.timeout
+        max_tokens = max_tokens or Config.OPENAI_MAX_TOKENS
+        deadline = time.monotonic() + timeout
+        self._count('calls')
+
+        estimate = estimate_tokens(messages, max_tokens)
+        wait = self.budget.reserve(estimate)
+        if wait > deadline - time.monotonic():
+            # The budget cannot free up in time; fail now rather than at the deadline
+            self.budget.refund(estimate)
+            self._count('over_budget')
+            raise TimeoutError(f"OpenAI token budget exhausted for {wait:.1f}s")
+
+        try:
+            return await asyncio.wait_for(self._send(messages, max_tokens, temperature, estimate, wait, deadline),
+                                          timeout=deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            self._count('timeouts')
+            raise TimeoutError(f"OpenAI completion exceeded {timeout:.1f}s")
+        except Exception:
+            self._count('failed')
+            raise
+
+    async def _send(self, messages: List[Dict], max_tokens: int, temperature: float,
+                    estimate: int, wait: float, deadline: float) -> str:
+        sent = False
+        try:
+            if wait > 0:
+                self._count('budget_waits')
+                await asyncio.sleep(wait)
+            client = self._ensure_client()
+            async with self.semaphore:
+                if deadline - time.monotonic() < MIN_CALL_TIME:
+                    raise asyncio.TimeoutError()
+                with self.lock:
+                    self.in_flight += 1
+                    self.stats['max_in_flight_seen'] = max(self.stats['max_in_flight_seen'], self.in_flight)
+                try:
+                    sent = True
+                    response = await client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        timeout=max(MIN_CALL_TIME, deadline - time.monotonic())
+                    )
+                finally:
+                    with self.lock:
+                        self.in_flight -= 1
+        except BaseException:
+            # Cancelled before the request went out: nothing was spent
+            if not sent:
+                self.budget.refund(estimate)
+            raise
+
+        usage = getattr(response, 'usage', None)
+        used = getattr(usage, 'total_tokens', None) or estimate
+        # Settle the reservation against what the call really used
+        self.budget.refund(estimate - used)
+        self._count('tokens_used', used)
+        self._count('completed')
+        return response.choices[0].message.content
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = self.in_flight
+        stats.update({
+            'max_in_flight': self.max_in_flight,
+            'timeout': self.timeout,
+            'budget_available': round(self.budget.available())
+        })
+        return stats
+
+
+# Global instance
+openai_client = AsyncCompletionClient()
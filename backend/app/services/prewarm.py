@@ -0,0 +1,250 @@
+"""
+Popularity-driven cache pre-warming
+
+Every search records its canonical ``(query, platform)`` key, and every
+trends lookup its trends cache key under the ``trends`` platform. A
+background scheduler keeps an exponentially decayed hit count per key in
+SQLite and, shortly before the cached results of the hottest keys expire,
+fetches them again so that users keep hitting a fresh cache.
+"""
+import math
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from config import Config
+from app.models.database import Database
+from app.models.search_cache import SearchCache
+from app.models.trends_cache import get_trends_cache, parse_trends_cache_key
+from app.services.background import PeriodicJob
+from app.services.rate_limiter import rate_limiter
+
+POPULARITY_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS query_popularity (
+        query TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        display TEXT NOT NULL,
+        max_results INTEGER NOT NULL,
+        heat REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        last_seen REAL NOT NULL,
+        last_refreshed REAL,
+        PRIMARY KEY (query, platform)
+    )
+    ''',
+    # The warm set is the top of this index
+    'CREATE INDEX IF NOT EXISTS idx_query_popularity_heat ON query_popularity(heat)',
+]
+
+# Pseudo-platform for Google Trends entries; ``query`` holds the trends cache key
+TRENDS_PLATFORM = 'trends'
+
+# Host whose rate budget a platform's refresh spends
+PLATFORM_HOSTS = {
+    'amazon': 'www.amazon.com',
+    'ebay': 'www.ebay.com',
+    TRENDS_PLATFORM: 'trends.google.com',
+}
+
+
+class PrewarmScheduler:
+    """Keeps the most popular search and trends cache entries warm
+
+    Popularity is a decayed counter stored as ``heat = log2(score) +
+    t / half_life``: every key decays at the same rate, so ordering by heat
+    ranks keys by their current decayed score without rewriting any rows,
+    and ``2 ** (heat - now / half_life)`` recovers the score itself.
+
+    Refreshes only spend rate budget above ``PREWARM_MIN_TOKENS`` and wait
+    for ``PREWARM_QUIET_PERIOD`` seconds without interactive searches, so
+    users never queue behind the pre-warmer.
+    """
+
+    def __init__(self, db: Database = None, top_n: int = None, interval: float = None,
+                 lead_time: float = None, half_life: float = None):
+        self._db = db
+        self.top_n = top_n or Config.PREWARM_TOP_N
+        self.interval = interval or Config.PREWARM_INTERVAL
+        self.lead_time = lead_time or Config.PREWARM_LEAD_TIME
+        self.half_life = half_life or Config.PREWARM_HALF_LIFE
+        self.max_pending = Config.PREWARM_MAX_PENDING
+        self.lock = threading.Lock()
+        self.pending: Dict[Tuple[str, str], List] = {}
+        self.last_interactive = 0.0
+        self.worker = PeriodicJob('cache-prewarm', self.run_once, lambda: self.interval, 'cache pre-warming')
+        self.stats = {
+            'runs': 0, 'refreshed': 0, 'failed': 0,
+            'skipped_budget': 0, 'yielded': 0, 'dropped': 0, 'last_run': None
+        }
+
+    @property
+    def db(self) -> Database:
+        if self._db is None:
+            self._db = Database.for_path()
+            self._db.ensure_schema('query_popularity', POPULARITY_SCHEMA)
+        return self._db
+
+    def ensure_started(self):
+        if Config.PREWARM_ENABLED:
+            self.worker.ensure_started()
+
+    def record(self, query_key: str, display: str, platform: str, max_results: int):
+        """Count an interactive search; hits are buffered and flushed by the scheduler"""
+        if not Config.PREWARM_ENABLED:
+            # Nothing would ever flush the buffer
+            return
+        self.ensure_started()
+        now = time.time()
+        with self.lock:
+            self.last_interactive = now
+            entry = self.pending.get((query_key, platform))
+            if entry is None:
+                if len(self.pending) >= self.max_pending:
+                    self._drop_coldest()
+                self.pending[(query_key, platform)] = [display, max_results, 1, now]
+            else:
+                entry[0], entry[1], entry[3] = display, max_results, now
+                entry[2] += 1
+
+    def _drop_coldest(self):
+        """Make room in a full buffer (flush stalled or failing) by dropping its coldest quarter"""
+        # Fewest hits first, least recently seen among equals; called with the lock held
+        coldest = sorted(self.pending, key=lambda key: (self.pending[key][2], self.pending[key][3]))
+        coldest = coldest[:max(1, len(coldest) // 4)]
+        for key in coldest:
+            del self.pending[key]
+        self.stats['dropped'] += len(coldest)
+
+    def flush(self) -> int:
+        """Fold buffered hits into the decayed counters in SQLite"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return 0
+
+        with self.db.write() as conn:
+            for (query_key, platform), (display, max_results, hits, seen) in pending.items():
+                row = conn.execute(
+                    'SELECT heat FROM query_popularity WHERE query = ? AND platform = ?',
+                    (query_key, platform)
+                ).fetchone()
+                # Decay the stored score to ``seen`` and add this interval's hits
+                score = hits + (2 ** (row[0] - seen / self.half_life) if row else 0.0)
+                heat = math.log2(score) + seen / self.half_life
+                conn.execute('''
+                    INSERT INTO query_popularity (query, platform, display, max_results, heat, hits, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(query, platform) DO UPDATE SET
+                        display = excluded.display,
+                        max_results = excluded.max_results,
+                        heat = excluded.heat,
+                        hits = query_popularity.hits + excluded.hits,
+                        last_seen = excluded.last_seen
+                ''', (query_key, platform, display, max_results, heat, hits, seen))
+        return len(pending)
+
+    def warm_set(self) -> List[Dict]:
+        """The ``top_n`` hottest keys with their current score and cache state"""
+        now = time.time()
+        rows = self.db.connection().execute('''
+            SELECT query, platform, display, max_results, heat, hits, last_seen, last_refreshed
+            FROM query_popularity
+            ORDER BY heat DESC
+            LIMIT ?
+        ''', (self.top_n,)).fetchall()
+
+        cache = SearchCache(self.db)
+        trends_cache = get_trends_cache(self.db)
+        warm = []
+        for query_key, platform, display, max_results, heat, hits, last_seen, last_refreshed in rows:
+            if platform == TRENDS_PLATFORM:
+                expires_in = trends_cache.expires_in(query_key)
+            else:
+                entry = cache.get_entry(query_key, platform)
+                expires_in = cache.ttl_for(platform) - entry[1] if entry else None
+            warm.append({
+                'query': query_key,
+                'platform': platform,
+                'display': display,
+                'max_results': max_results,
+                'score': round(2 ** (heat - now / self.half_life), 3),
+                'hits': hits,
+                'last_seen': last_seen,
+                'last_refreshed': last_refreshed,
+                'expires_in': round(expires_in) if expires_in is not None else None
+            })
+        return warm
+
+    def _should_yield(self) -> bool:
+        with self.lock:
+            return time.time() - self.last_interactive < Config.PREWARM_QUIET_PERIOD
+
+    def run_once(self) -> Dict:
+        """Flush popularity counts, then refresh warm entries that are about to expire"""
+        self.flush()
+        refreshed = failed = skipped = yielded = 0
+
+        for entry in self.warm_set():
+            if entry['expires_in'] is not None and entry['expires_in'] > self.lead_time:
+                continue
+            if self._should_yield():
+                yielded += 1
+                break
+            host = PLATFORM_HOSTS.get(entry['platform'].lower())
+            if host and rate_limiter.available(host) < Config.PREWARM_MIN_TOKENS:
+                skipped += 1
+                continue
+            if self._refresh(entry):
+                refreshed += 1
+            else:
+                failed += 1
+
+        with self.lock:
+            self.stats['runs'] += 1
+            self.stats['refreshed'] += refreshed
+            self.stats['failed'] += failed
+            self.stats['skipped_budget'] += skipped
+            self.stats['yielded'] += yielded
+            self.stats['last_run'] = time.time()
+        return {'refreshed': refreshed, 'failed': failed, 'skipped_budget': skipped, 'yielded': yielded}
+
+    def _refresh(self, entry: Dict) -> bool:
+        # Imported here: both services record into this module
+        from app.services.product_search import product_search
+        from app.services.trends import TrendsAnalyzer
+
+        try:
+            if entry['platform'] == TRENDS_PLATFORM:
+                result = TrendsAnalyzer().refresh_trend_data(*parse_trends_cache_key(entry['query']))
+            else:
+                result = product_search.refresh_platform(entry['display'], entry['platform'], entry['max_results'])
+        except Exception as e:
+            print(f"Error pre-warming {entry['platform']} results for '{entry['query']}': {e}")
+            return False
+
+        if result is None:
+            return False
+        with self.db.write() as conn:
+            conn.execute(
+                'UPDATE query_popularity SET last_refreshed = ? WHERE query = ? AND platform = ?',
+                (time.time(), entry['query'], entry['platform'])
+            )
+        return True
+
+    def get_status(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            stats['pending_keys'] = len(self.pending)
+        stats.update({
+            'enabled': Config.PREWARM_ENABLED,
+            'top_n': self.top_n,
+            'interval': self.interval,
+            'lead_time': self.lead_time,
+            'half_life': self.half_life
+        })
+        return {'stats': stats, 'warm_set': self.warm_set()}
+
+
+# Global instance
+prewarm_scheduler = PrewarmScheduler()
@@ -0,0 +1,135 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Optional, Tuple
+
+from config import Config
+from app.services.scraper import MarketplaceScraper
+from app.services.single_flight import single_flight, flight_key
+from app.services.revalidator import revalidator
+from app.services.prewarm import prewarm_scheduler
+from app.services.query_normalizer import normalize_query, NormalizedQuery
+from app.models.product import Product
+
+
+class ProductSearch:
+    """Runs per-platform product searches concurrently with a deadline per platform"""
+
+    def __init__(self, max_workers: int = None):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.SEARCH_MAX_WORKERS,
+            thread_name_prefix='platform-search'
+        )
+
+    def platform_timeout(self, platform: str) -> float:
+        """Deadline in seconds for a single platform"""
+        return Config.PLATFORM_TIMEOUTS.get(platform.lower(), Config.PLATFORM_TIMEOUT)
+
+    def search_platform(self, query: str, platform: str, max_results: int = 20) -> Tuple[Optional[List[Dict]], bool]:
+        """Search one platform and return ``(products, stale)``
+
+        Fresh cache entries are returned as they are. An entry past its TTL
+        but inside the stale window is returned immediately with
+        ``stale=True`` while a background refresh replaces it; only a miss
+        scrapes in the request.
+        """
+        product_model = Product()
+        normalized = normalize_query(query)
+
+        # Cache and coalescing use the canonical key; scraping uses what the user typed
+        cached = product_model.lookup_cached_products(normalized.key, platform)
+        if cached:
+            products, stale = cached
+            if stale:
+                revalidator.schedule(
+                    ('search', normalized.key, platform),
+                    lambda: self._coalesced_scrape(normalized, platform, max_results, product_model)
+                )
+        else:
+            products, stale = self._coalesced_scrape(normalized, platform, max_results, product_model), False
+
+        if products is not None:
+            # Feeds the pre-warmer's popularity ranking
+            prewarm_scheduler.record(normalized.key, normalized.display, platform, max_results)
+        return products, stale
+
+    def refresh_platform(self, query: str, platform: str, max_results: int = 20) -> Optional[List[Dict]]:
+        """Re-scrape one platform and replace its cache entry, whatever its age"""
+        return self._coalesced_scrape(normalize_query(query), platform, max_results, Product())
+
+    def _coalesced_scrape(self, normalized: NormalizedQuery, platform: str, max_results: int,
+                          product_model: Product) -> Optional[List[Dict]]:
+        """Identical concurrent scrapes, in this worker or another, run once"""
+        return single_flight.run(
+            flight_key(normalized.key, platform, max_results),
+            lambda: self._scrape_platform(normalized, platform, max_results, product_model),
+            lookup=lambda: product_model.get_cached_products(normalized.key, platform)
+        )
+
+    def _scrape_platform(self, normalized: NormalizedQuery, platform: str, max_results: int,
+                         product_model: Product) -> Optional[List[Dict]]:
+        """Scrape fresh data, then persist and cache it"""
+        scraper = MarketplaceScraper()
+        if platform.lower() == 'amazon':
+            products = scraper.search_amazon(normalized.display, max_results)
+        elif platform.lower() == 'ebay':
+            products = scraper.search_ebay(normalized.display, max_results)
+        else:
+            return None
+
+        # Persisted in the background; the request only enqueues
+        product_model.enqueue_products(products)
+
+        try:
+            product_model.cache_products(normalized.key, platform, products)
+        except Exception as e:
+            print(f"Error caching results for {platform}: {e}")
+
+        return products
+
+    def search(self, query: str, platforms: List[str], max_results: int = 20) -> Dict:
+        """Fan a search out to all platforms and merge the results in request order
+
+        A platform that misses its deadline or raises is reported in
+        ``partial_platforms`` instead of failing the whole search; one served
+        from a stale cache entry is reported in ``stale_platforms``.
+        """
+        platforms = list(dict.fromkeys(platforms))
+        started = time.monotonic()
+        futures = {
+            platform: self.executor.submit(self.search_platform, query, platform, max_results)
+            for platform in platforms
+        }
+
+        all_products = []
+        partial_platforms = []
+        stale_platforms = []
+        for platform in platforms:
+            future = futures[platform]
+            remaining = started + self.platform_timeout(platform) - time.monotonic()
+            try:
+                products, stale = future.result(timeout=max(0, remaining))
+            except FutureTimeoutError:
+                # Leave a running scrape alone so it can still populate the cache
+                future.cancel()
+                print(f"{platform} search timed out, returning partial results")
+                partial_platforms.append(platform)
+                continue
+            except Exception as e:
+                print(f"{platform} search failed: {e}")
+                partial_platforms.append(platform)
+                continue
+
+            if stale:
+                stale_platforms.append(platform)
+            if products:
+                all_products.extend(products)
+
+        return {
+            'products': all_products,
+            'partial_platforms': partial_platforms,
+            'stale_platforms': stale_platforms
+        }
+
+
+# Global instance
+product_search = ProductSearch()
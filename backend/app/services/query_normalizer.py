@@ -0,0 +1,50 @@
+"""
+Canonical query keys shared by the search, analysis and chat routes
+"""
+import re
+import unicodedata
+from typing import NamedTuple
+
+from config import Config
+
+# Dropped only with QUERY_REMOVE_STOP_WORDS. Direction words ('to', 'from',
+# 'with', 'for') are kept: "usb to hdmi" and "hdmi to usb" are different
+# products. Titles can still collide ("the office" vs. "office"), which is
+# why removal is off by default.
+STOP_WORDS = {
+    'a', 'an', 'the', 'of', 'and', 'in', 'on', 'at', 'by'
+}
+
+_TOKEN = re.compile(r"\w+(?:[-'.]\w+)*")
+
+
+class NormalizedQuery(NamedTuple):
+    display: str  # what the user typed, trimmed; used for scraping and responses
+    key: str      # canonical form; used for cache lookups and request coalescing
+
+
+def normalize_query(query: str, remove_stop_words: bool = None, order_insensitive: bool = None) -> NormalizedQuery:
+    """Normalize a search query into a display string and a canonical key
+
+    The key is Unicode-normalized (NFKC), case-folded and whitespace
+    collapsed, with punctuation between words dropped. Stop-word removal and
+    token sorting are controlled by ``QUERY_REMOVE_STOP_WORDS`` and
+    ``QUERY_ORDER_INSENSITIVE`` unless given explicitly.
+    """
+    if remove_stop_words is None:
+        remove_stop_words = Config.QUERY_REMOVE_STOP_WORDS
+    if order_insensitive is None:
+        order_insensitive = Config.QUERY_ORDER_INSENSITIVE
+
+    display = ' '.join((query or '').split())
+    text = unicodedata.normalize('NFKC', display).casefold()
+    tokens = _TOKEN.findall(text)
+
+    if remove_stop_words:
+        # Never strip a query down to nothing ("the the" stays searchable)
+        tokens = [token for token in tokens if token not in STOP_WORDS] or tokens
+
+    if order_insensitive:
+        tokens = sorted(tokens)
+
+    return NormalizedQuery(display=display, key=' '.join(tokens) or text.strip())
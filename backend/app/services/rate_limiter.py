@@ -0,0 +1,107 @@
+"""
+Process-wide outbound rate limiting keyed by host
+"""
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+from config import Config
+
+
+class TokenBucket:
+    """Token bucket that refills continuously at ``rate`` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens and return how long the caller must wait before using them"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            # The bucket is in debt; the caller waits until its tokens are refilled
+            return -self.tokens / self.rate
+
+    def refund(self, amount: float):
+        """Return reserved tokens that were not used (negative to charge extra)"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def available(self) -> float:
+        """Tokens currently available without waiting"""
+        with self.lock:
+            self._refill(time.monotonic())
+            return max(0.0, self.tokens)
+
+
+class HostRateLimiter:
+    """Shares one token bucket per host across every thread in the process
+
+    Requests only wait once a host's burst allowance is used up, so an idle
+    host is hit immediately while sustained traffic is held to
+    ``requests_per_minute``.
+    """
+
+    def __init__(self, requests_per_minute: float = None, burst: int = None):
+        self.requests_per_minute = requests_per_minute or Config.REQUESTS_PER_MINUTE
+        self.burst = burst or Config.RATE_LIMIT_BURST
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+        self.stats = {'acquired': 0, 'delayed': 0, 'total_wait': 0.0}
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.requests_per_minute / 60.0, self.burst)
+                self.buckets[host] = bucket
+            return bucket
+
+    @staticmethod
+    def host_for(url_or_host: str) -> str:
+        """Normalize a URL or bare host name to the bucket key"""
+        if '://' in url_or_host:
+            return urlparse(url_or_host).netloc.lower()
+        return url_or_host.lower()
+
+    def acquire(self, url_or_host: str) -> float:
+        """Block until a request to the host is allowed; returns the time waited"""
+        wait = self._bucket(self.host_for(url_or_host)).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        with self.lock:
+            self.stats['acquired'] += 1
+            if wait > 0:
+                self.stats['delayed'] += 1
+                self.stats['total_wait'] += wait
+        return wait
+
+    def available(self, url_or_host: str) -> float:
+        """Remaining burst budget for a host"""
+        return self._bucket(self.host_for(url_or_host)).available()
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            hosts = list(self.buckets.items())
+        stats['requests_per_minute'] = self.requests_per_minute
+        stats['burst'] = self.burst
+        stats['hosts'] = {host: round(bucket.available(), 2) for host, bucket in hosts}
+        return stats
+
+
+# Global instance
+rate_limiter = HostRateLimiter()
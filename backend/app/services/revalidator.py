@@ -0,0 +1,66 @@
+"""
+Stale-while-revalidate: serve a stale cache entry now, refresh it in the background
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable
+
+from config import Config
+
+
+class Revalidator:
+    """Runs background cache refreshes, at most one per key at a time
+
+    Callers that hit a stale entry schedule its refresh and return the stale
+    value straight away. Deduplication here is per process; refresh functions
+    that go through ``single_flight`` are also coalesced across workers.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.REVALIDATE_MAX_WORKERS,
+            thread_name_prefix='revalidate'
+        )
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.stats = {'scheduled': 0, 'deduplicated': 0, 'refreshed': 0, 'failed': 0}
+
+    def schedule(self, key: Hashable, refresh: Callable[[], Any]) -> bool:
+        """Queue ``refresh`` unless a refresh for ``key`` is already pending"""
+        with self.lock:
+            if key in self.pending:
+                self.stats['deduplicated'] += 1
+                return False
+            self.pending.add(key)
+            self.stats['scheduled'] += 1
+
+        try:
+            self.executor.submit(self._refresh, key, refresh)
+        except RuntimeError as e:
+            # Interpreter shutdown; the stale value was still served
+            print(f"Error scheduling cache refresh: {e}")
+            with self.lock:
+                self.pending.discard(key)
+            return False
+        return True
+
+    def _refresh(self, key: Hashable, refresh: Callable[[], Any]):
+        try:
+            refresh()
+            outcome = 'refreshed'
+        except Exception as e:
+            print(f"Error refreshing stale cache entry {key}: {e}")
+            outcome = 'failed'
+        with self.lock:
+            self.pending.discard(key)
+            self.stats[outcome] += 1
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            stats['pending'] = len(self.pending)
+        return stats
+
+
+# Global instance
+revalidator = Revalidator()
@@ -1,10 +1,10 @@
-import requests
-from bs4 import BeautifulSoup
 import json
-import time
 import random
 from typing import List, Dict
 from urllib.parse import quote_plus
+from app.services.http_client import http_client
+from app.services.html_extract import extract_products, extract_products_streaming, streaming_supported
+from config import Config
 
 class MarketplaceScraper:
     def __init__(self):
@@ -16,8 +16,8 @@ class MarketplaceScraper:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # Shared, pooled session so connections outlive this scraper instance
+        self.http = http_client
         
     def _generate_mock_data(self, query: str, platform: str, count: int = 20) -> List[Dict]:
         """Generate realistic mock data for testing when scraping fails"""
@@ -169,224 +169,53 @@ class MarketplaceScraper:
     
     def search_amazon(self, query: str, max_results: int = 20) -> List[Dict]:
         """Scrape Amazon search results with fallback to mock data"""
-        products = []
-        
-        try:
-            url = f"https://www.amazon.com/s?k={quote_plus(query)}&ref=sr_pg_1"
-            
-            # Add delay to avoid rate limiting
-            time.sleep(random.uniform(1, 3))
-            
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code != 200:
-                return self._generate_mock_data(query, 'Amazon', max_results)
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try multiple selectors for product containers
-            selectors = [
-                'div[data-component-type="s-search-result"]',
-                '.s-result-item',
-                '[data-asin]'
-            ]
-            
-            product_containers = []
-            for selector in selectors:
-                product_containers = soup.select(selector)
-                if product_containers:
-                    break
-            
-            if not product_containers:
-                return self._generate_mock_data(query, 'Amazon', max_results)
-            
-            for container in product_containers[:max_results]:
-                try:
-                    # Try multiple selectors for title
-                    title = None
-                    title_selectors = [
-                        'h2 a span',
-                        '.a-size-medium span',
-                        '.a-size-base-plus',
-                        'h2 span'
-                    ]
-                    
-                    for selector in title_selectors:
-                        title_elem = container.select_one(selector)
-                        if title_elem:
-                            title = title_elem.get_text().strip()
-                            break
-                    
-                    if not title:
-                        continue
-                    
-                    # Try to get price
-                    price = 0
-                    price_selectors = [
-                        '.a-price-whole',
-                        '.a-offscreen',
-                        '.a-price .a-offscreen'
-                    ]
-                    
-                    for selector in price_selectors:
-                        price_elem = container.select_one(selector)
-                        if price_elem:
-                            price_text = price_elem.get_text().replace('$', '').replace(',', '')
-                            try:
-                                price = float(price_text.split()[0])
-                                break
-                            except:
-                                continue
-                    
-                    # Try to get rating
-                    rating = 0
-                    rating_elem = container.select_one('.a-icon-alt')
-                    if rating_elem:
-                        rating_text = rating_elem.get_text()
-                        try:
-                            rating = float(rating_text.split()[0])
-                        except:
-                            pass
-                    
-                    # Try to get reviews count
-                    reviews_count = 0
-                    reviews_elem = container.select_one('.a-size-base')
-                    if reviews_elem:
-                        reviews_text = reviews_elem.get_text().replace(',', '')
-                        try:
-                            reviews_count = int(''.join(filter(str.isdigit, reviews_text)))
-                        except:
-                            pass
-                    
-                    # Get product URL
-                    link_elem = container.select_one('h2 a')
-                    product_url = f"https://www.amazon.com{link_elem['href']}" if link_elem else ""
-                    
-                    products.append({
-                        'title': title,
-                        'price': price,
-                        'rating': rating,
-                        'reviews_count': reviews_count,
-                        'platform': 'Amazon',
-                        'url': product_url,
-                        'search_query': query,
-                        'seller': 'Amazon Seller'
-                    })
-                    
-                except Exception as e:
-                    continue
-            
-            
-        except Exception as e:
-        
-        # If we didn't get enough products, supplement with mock data
-        if len(products) < 5:
-            mock_products = self._generate_mock_data(query, 'Amazon', max_results - len(products))
-            products.extend(mock_products)
-        
-        return products[:max_results]
+        return self._search_platform(
+            f"https://www.amazon.com/s?k={quote_plus(query)}&ref=sr_pg_1",
+            'Amazon', query, max_results
+        )
     
     def search_ebay(self, query: str, max_results: int = 20) -> List[Dict]:
         """Scrape eBay search results with fallback to mock data"""
+        return self._search_platform(
+            f"https://www.ebay.com/sch/i.html?_nkw={quote_plus(query)}&_sacat=0",
+            'eBay', query, max_results
+        )
+    
+    def _search_platform(self, url: str, platform: str, query: str, max_results: int) -> List[Dict]:
+        """Fetch a result page and extract products, supplementing with mock data"""
         products = []
         
         try:
-            url = f"https://www.ebay.com/sch/i.html?_nkw={quote_plus(query)}&_sacat=0"
+            streaming = Config.SCRAPER_STREAMING and streaming_supported()
             
-            # Add delay to avoid rate limiting
-            time.sleep(random.uniform(1, 3))
-            
-            response = self.session.get(url, timeout=10)
+            # Pooled request; only waits once this host's rate budget is used up
+            response = self.http.get(url, headers=self.headers, timeout=10, stream=streaming)
             
             if response.status_code != 200:
-                return self._generate_mock_data(query, 'eBay', max_results)
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try multiple selectors for product containers
-            selectors = [
-                '.s-item__wrapper',
-                '.s-item',
-                '[data-view="mi:1686"]'
-            ]
+                response.close()
+                return self._generate_mock_data(query, platform, max_results)
             
-            product_containers = []
-            for selector in selectors:
-                product_containers = soup.select(selector)
-                if product_containers:
-                    break
-            
-            if not product_containers:
-                return self._generate_mock_data(query, 'eBay', max_results)
-            
-            for container in product_containers[:max_results]:
+            if streaming:
+                # Stop downloading as soon as enough products are extracted
                 try:
-                    # Skip sponsored items
-                    if container.select_one('.s-item__title--tag'):
-                        continue
-                    
-                    # Try to get title
-                    title = None
-                    title_selectors = [
-                        '.s-item__title span',
-                        '.s-item__title',
-                        'h3 span'
-                    ]
-                    
-                    for selector in title_selectors:
-                        title_elem = container.select_one(selector)
-                        if title_elem:
-                            title = title_elem.get_text().strip()
-                            if title and title != "Shop on eBay":
-                                break
-                    
-                    if not title or title == "Shop on eBay":
-                        continue
-                    
-                    # Try to get price
-                    price = 0
-                    price_selectors = [
-                        '.s-item__price .notranslate',
-                        '.s-item__price',
-                        '.s-item__detail--primary .s-item__price'
-                    ]
-                    
-                    for selector in price_selectors:
-                        price_elem = container.select_one(selector)
-                        if price_elem:
-                            price_text = price_elem.get_text().replace('$', '').replace(',', '')
-                            try:
-                                # Handle price ranges like "$10.99 to $15.99"
-                                if 'to' in price_text:
-                                    price_text = price_text.split('to')[0].strip()
-                                price = float(price_text.split()[0])
-                                break
-                            except:
-                                continue
-                    
-                    # Get product URL
-                    link_elem = container.select_one('.s-item__link')
-                    product_url = link_elem['href'] if link_elem else ""
-                    
-                    products.append({
-                        'title': title,
-                        'price': price,
-                        'rating': 0,  # eBay doesn't show ratings in search results
-                        'reviews_count': 0,
-                        'platform': 'eBay',
-                        'url': product_url,
-                        'search_query': query
-                    })
-                    
-                except Exception as e:
-                    continue
-            
+                    extracted, _ = extract_products_streaming(
+                        response.iter_content(chunk_size=Config.SCRAPER_CHUNK_SIZE),
+                        platform, query, max_results
+                    )
+                finally:
+                    response.close()
+            else:
+                extracted = extract_products(response.content, platform, query, max_results)
+            if extracted is None:
+                return self._generate_mock_data(query, platform, max_results)
+            products = extracted
             
         except Exception as e:
+            print(f"Error scraping {platform}: {e}")
         
         # If we didn't get enough products, supplement with mock data
         if len(products) < 5:
-            mock_products = self._generate_mock_data(query, 'eBay', max_results - len(products))
+            mock_products = self._generate_mock_data(query, platform, max_results - len(products))
             products.extend(mock_products)
         
         return products[:max_results]
@@ -424,5 +253,6 @@ class MarketplaceScraper:
             
             
         except Exception as e:
+            print(f"Error generating Shopify stores: {e}")
         
         return stores
\ No newline at end of file
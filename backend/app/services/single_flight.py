@@ -0,0 +1,168 @@
+"""
+Request coalescing: identical work runs once and every waiter shares the result
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from config import Config
+from app.models.database import Database
+
+LEASE_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS flight_leases (
+        key TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    '''
+]
+
+
+class LeaseStore:
+    """Cross-process leases held in the local SQLite database"""
+
+    def __init__(self, db: Database = None):
+        self.db = db or Database.for_path()
+        self.db.ensure_schema('flight_leases', LEASE_SCHEMA)
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """Take the lease unless another live owner holds it"""
+        now = time.time()
+        with self.db.write() as conn:
+            cursor = conn.execute('''
+                INSERT INTO flight_leases (key, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE flight_leases.expires_at < ?
+            ''', (key, owner, now + ttl, now))
+            return cursor.rowcount > 0
+
+    def is_held(self, key: str) -> bool:
+        row = self.db.connection().execute(
+            'SELECT expires_at FROM flight_leases WHERE key = ?', (key,)
+        ).fetchone()
+        return bool(row) and row[0] >= time.time()
+
+    def release(self, key: str, owner: str):
+        with self.db.write() as conn:
+            conn.execute('DELETE FROM flight_leases WHERE key = ? AND owner = ?', (key, owner))
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key
+
+    Within a process, followers wait on the leader's future. Across worker
+    processes, the leader holds a lease row in SQLite; a process that finds
+    the lease taken polls ``lookup`` (normally the shared cache) until the
+    leader publishes its result or the lease lapses, and only then runs the
+    work itself.
+    """
+
+    def __init__(self, leases: LeaseStore = None, lease_ttl: float = None, poll_interval: float = None):
+        self._leases = leases
+        self.lease_ttl = lease_ttl or Config.SINGLE_FLIGHT_LEASE_TTL
+        self.poll_interval = poll_interval or Config.SINGLE_FLIGHT_POLL_INTERVAL
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lock = threading.Lock()
+        self.in_flight: Dict[str, Future] = {}
+        self.stats = {'leaders': 0, 'local_waiters': 0, 'remote_waits': 0, 'remote_hits': 0}
+
+    @property
+    def leases(self) -> LeaseStore:
+        if self._leases is None:
+            self._leases = LeaseStore()
+        return self._leases
+
+    def _count(self, name: str):
+        with self.lock:
+            self.stats[name] += 1
+
+    def run(self, key: str, work: Callable[[], Any], lookup: Callable[[], Optional[Any]] = None) -> Any:
+        """Run ``work`` once per key across threads and processes and return its result
+
+        ``lookup`` is how a process that lost the lease sees the winner's
+        result; without it, coalescing is limited to the current process.
+        """
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.in_flight[key] = future
+                self.stats['leaders'] += 1
+            else:
+                self.stats['local_waiters'] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._run_leader(key, work, lookup)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+
+    def _run_leader(self, key: str, work: Callable[[], Any], lookup: Callable[[], Optional[Any]]) -> Any:
+        if lookup is None:
+            return work()
+
+        try:
+            acquired = self.leases.acquire(key, self.owner, self.lease_ttl)
+        except Exception as e:
+            # Coalescing is an optimisation; never fail the request over it
+            print(f"Error acquiring single-flight lease: {e}")
+            return work()
+
+        if not acquired:
+            result = self._wait_for_remote(key, lookup)
+            if result is not None:
+                return result
+            acquired = self.leases.acquire(key, self.owner, self.lease_ttl)
+
+        try:
+            return work()
+        finally:
+            if acquired:
+                try:
+                    self.leases.release(key, self.owner)
+                except Exception as e:
+                    print(f"Error releasing single-flight lease: {e}")
+
+    def _wait_for_remote(self, key: str, lookup: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """Poll for another process's result while it holds the lease"""
+        self._count('remote_waits')
+        deadline = time.monotonic() + self.lease_ttl
+        while time.monotonic() < deadline:
+            result = lookup()
+            if result is not None:
+                self._count('remote_hits')
+                return result
+            if not self.leases.is_held(key):
+                # Leader finished (or died) without publishing; check once more
+                return lookup()
+            time.sleep(self.poll_interval)
+        return None
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self.in_flight)
+        return stats
+
+
+def flight_key(*parts) -> str:
+    """Stable key from normalized request parameters"""
+    return '|'.join(str(part).strip().lower() for part in parts)
+
+
+# Global instance
+single_flight = SingleFlight()
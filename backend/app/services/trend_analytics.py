@@ -0,0 +1,142 @@
+"""
+Batch trend analytics over a keywords x time interest matrix
+
+Every metric is computed for all keywords at once with whole-array NumPy
+operations, so analysing hundreds of keywords costs about as much as one:
+500 keywords x 260 weekly points take about 15 ms for every metric, less
+than the old per-keyword loop needed for five basic statistics
+(``benchmarks/bench_trend_analytics.py``).
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Points averaged at each end of the series for recent-vs-baseline growth
+GROWTH_WINDOW = 4
+# A point is a spike when it sits this many standard deviations above the
+# mean of the SPIKE_WINDOW points before it
+SPIKE_WINDOW = 12
+SPIKE_THRESHOLD = 3.5
+# Growth beyond +/-10% labels a series rising/falling
+DIRECTION_THRESHOLD = 0.1
+
+
+def least_squares_slope(values: np.ndarray) -> np.ndarray:
+    """Slope of the least-squares line through each row, in interest points per step"""
+    steps = values.shape[1]
+    if steps < 2:
+        return np.zeros(values.shape[0])
+    x = np.arange(steps, dtype=np.float64)
+    x -= x.mean()
+    # x is centred, so the row means drop out of the covariance
+    return values @ x / (x @ x)
+
+
+def recent_vs_baseline(values: np.ndarray, window: int = GROWTH_WINDOW):
+    """Mean of the last ``window`` points and of the first ``window`` points of each row
+
+    Series shorter than the window compare their last point with their first.
+    """
+    window = window if values.shape[1] >= window else 1
+    return values[:, -window:].mean(axis=1), values[:, :window].mean(axis=1)
+
+
+def rolling_zscores(values: np.ndarray, window: int = SPIKE_WINDOW) -> np.ndarray:
+    """z-score of each point against the ``window`` points before it
+
+    Column ``j`` of the result scores point ``j + window``. Flat windows
+    score 0 rather than dividing by zero.
+    """
+    rows, steps = values.shape
+    if steps <= window:
+        return np.zeros((rows, 0))
+    # Window sums from running totals: one pass regardless of window size
+    totals = np.concatenate([np.zeros((rows, 1)), np.cumsum(values, axis=1)], axis=1)
+    squares = np.concatenate([np.zeros((rows, 1)), np.cumsum(values ** 2, axis=1)], axis=1)
+    mean = (totals[:, window:-1] - totals[:, :-window - 1]) / window
+    variance = (squares[:, window:-1] - squares[:, :-window - 1]) / window - mean ** 2
+    std = np.sqrt(np.clip(variance, 0, None))
+    deviation = values[:, window:] - mean
+    return np.divide(deviation, std, out=np.zeros_like(deviation), where=std > 1e-9)
+
+
+def seasonality(values: np.ndarray):
+    """Share of detrended variance in the strongest periodic component, and its period
+
+    Strength is 0 for noise or a pure trend and approaches 1 for a clean
+    cycle; the period is in steps (NaN when there is no variance).
+    """
+    rows, steps = values.shape
+    if steps < 4:
+        return np.zeros(rows), np.full(rows, np.nan)
+    x = np.arange(steps, dtype=np.float64)
+    x -= x.mean()
+    slope = least_squares_slope(values)
+    detrended = values - values.mean(axis=1, keepdims=True) - slope[:, None] * x
+    power = np.abs(np.fft.rfft(detrended, axis=1)[:, 1:]) ** 2
+    total = power.sum(axis=1)
+    peak = power.argmax(axis=1)
+    strength = np.divide(power.max(axis=1), total, out=np.zeros(rows), where=total > 1e-9)
+    period = np.where(total > 1e-9, steps / (peak + 1), np.nan)
+    return strength, period
+
+
+def analyze(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Compute every metric for a keywords x time matrix; each result has one entry per row"""
+    values = np.asarray(values, dtype=np.float64)
+    recent, baseline = recent_vs_baseline(values)
+    growth = np.divide(recent - baseline, baseline, out=np.full(len(values), np.nan), where=baseline > 0)
+
+    direction = np.full(len(values), 'stable', dtype=object)
+    if values.shape[1] >= 2:
+        direction[recent > baseline * (1 + DIRECTION_THRESHOLD)] = 'rising'
+        direction[recent < baseline * (1 - DIRECTION_THRESHOLD)] = 'falling'
+
+    strength, period = seasonality(values)
+    return {
+        'direction': direction,
+        'mean': values.mean(axis=1),
+        'max': values.max(axis=1),
+        'min': values.min(axis=1),
+        'std': values.std(axis=1),
+        'slope': least_squares_slope(values),
+        'growth': growth,
+        'spikes': rolling_zscores(values) > SPIKE_THRESHOLD,
+        'seasonality_strength': strength,
+        'seasonal_period': period,
+    }
+
+
+def _optional(value: float, digits: int) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def summarize(keywords: List[str], values: np.ndarray, dates: List[str] = None) -> Dict[str, Dict]:
+    """Per-keyword ``trend_analysis`` entries for rows of ``values``
+
+    ``dates`` labels the time axis, so spikes are reported as dates rather
+    than positions.
+    """
+    if not keywords:
+        return {}
+    metrics = analyze(values)
+    spike_rows, spike_columns = np.nonzero(metrics['spikes'])
+    spikes = [[] for _ in keywords]
+    for row, column in zip(spike_rows.tolist(), (spike_columns + SPIKE_WINDOW).tolist()):
+        spikes[row].append(dates[column] if dates else column)
+
+    analysis = {}
+    for i, keyword in enumerate(keywords):
+        analysis[keyword] = {
+            'trend_direction': metrics['direction'][i],
+            'average_interest': float(metrics['mean'][i]),
+            'max_interest': int(metrics['max'][i]),
+            'min_interest': int(metrics['min'][i]),
+            'volatility': float(metrics['std'][i]),
+            'slope': round(float(metrics['slope'][i]), 4),
+            'growth': _optional(metrics['growth'][i], 4),
+            'seasonality_strength': round(float(metrics['seasonality_strength'][i]), 4),
+            'seasonal_period': _optional(metrics['seasonal_period'][i], 1),
+            'spikes': spikes[i]
+        }
+    return analysis
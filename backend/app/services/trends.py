@@ -1,47 +1,172 @@
-from pytrends.request import TrendReq
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+import numpy as np
 import pandas as pd
+import copy
+import math
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
 
+from config import Config
+
+from app.models.trends_cache import get_trends_cache, trends_cache_key
+from app.models.trends_series import get_trends_series_store, timeframe_window, to_days, from_days
+from app.services import trend_analytics
+from app.services.rate_limiter import rate_limiter
+from app.services.revalidator import revalidator
+from app.services.single_flight import single_flight, flight_key
+from app.services.trends_sessions import trends_session_pool
+from app.services.prewarm import prewarm_scheduler, PLATFORM_HOSTS, TRENDS_PLATFORM
+
+TRENDS_HOST = PLATFORM_HOSTS[TRENDS_PLATFORM]
+
+# Google Trends compares at most this many keywords per request
+MAX_KEYWORDS_PER_REQUEST = 5
+
+# Shared by all requests for the per-payload sub-queries; separate from the
+# per-call group pool so group tasks never wait on their own pool
+_subfetch_executor = ThreadPoolExecutor(
+    max_workers=Config.TRENDS_SUBFETCH_WORKERS,
+    thread_name_prefix='trends-subfetch'
+)
+
+
+def anchored_groups(anchor: str, keywords: List[str]) -> List[List[str]]:
+    """Split keywords into request-sized groups that all start with ``anchor``
+
+    The shared anchor is what ``merge_anchored_frames`` uses to put the
+    groups on one scale.
+    """
+    size = MAX_KEYWORDS_PER_REQUEST - 1
+    return [[anchor] + keywords[i:i + size] for i in range(0, len(keywords), size)]
+
+
+def choose_anchor(frame: pd.DataFrame, keywords: List[str]) -> str:
+    """The keyword with the most interest in ``frame``
+
+    Google rounds to integers on a 0-100 scale, so a low-interest anchor
+    carries large relative rounding errors into every factor computed from it.
+    """
+    totals = frame.reindex(columns=keywords).fillna(0).sum()
+    return totals.idxmax() if totals.max() > 0 else keywords[0]
+
+
+def merge_anchored_frames(frames: List[pd.DataFrame], anchor: str) -> Tuple[pd.DataFrame, List[str]]:
+    """Merge interest-over-time frames from separate requests onto one 0-100 scale
+
+    Google scales each request so that its own peak is 100. The anchor is in
+    every group, so the ratio of its totals gives each group's factor
+    relative to the first; the merged frame is then rescaled so its overall
+    peak is 100 again, as if all keywords had been compared in one request.
+
+    A group whose anchor has no interest cannot be calibrated. Its keywords
+    are left out of the merged frame rather than merged on the wrong scale,
+    and returned as the second element.
+    """
+    frames = [frame.drop(columns='isPartial', errors='ignore') for frame in frames]
+    reference = float(frames[0][anchor].sum())
+    merged = frames[0].astype(float)
+    unscaled = []
+    for frame in frames[1:]:
+        own = float(frame[anchor].sum())
+        keywords = [keyword for keyword in frame.columns if keyword != anchor]
+        if not reference or not own:
+            print(f"Trends anchor '{anchor}' has no interest; cannot scale {keywords}")
+            unscaled.extend(keywords)
+            continue
+        merged = merged.join(frame[keywords].astype(float) * (reference / own), how='outer')
+    return normalize_peak(merged), unscaled
+
+
+def normalize_peak(frame: pd.DataFrame) -> pd.DataFrame:
+    """Rescale so the highest value in the frame is 100, as Google reports it"""
+    peak = frame.max().max()
+    if peak > 0:
+        frame = frame * (100.0 / peak)
+    return frame.fillna(0).round().astype(int)
+
 class TrendsAnalyzer:
     def __init__(self):
+        # Cheap to construct: pytrends clients come from the shared session pool
+        self.cache = get_trends_cache()
+        self.history = get_trends_series_store()
+        self.sessions = trends_session_pool
+    
+    def get_trend_data(self, keywords: List[str], timeframe: str = 'today 12-m', geo: str = '') -> Dict:
+        """Get Google Trends data for keywords, cached, with fallback to mock data
+        
+        Results are cached by (sorted keywords, timeframe, geo). A stale entry
+        is returned at once with ``stale: True`` while it is refreshed in the
+        background, and identical concurrent fetches are coalesced.
+        """
+        # More than 5 keywords are fetched in anchored groups (Google allows 5 per request)
+        keywords = keywords[:Config.TRENDS_MAX_KEYWORDS]
+        cache_key = trends_cache_key(keywords, timeframe, geo)
+        
+        cached = self.cache.lookup(cache_key)
+        if cached:
+            trend_data, stale = cached
+            self.cache.count('stale_hits' if stale else 'hits')
+            if stale:
+                revalidator.schedule(
+                    ('trends', cache_key),
+                    lambda: self._coalesced_fetch(cache_key, keywords, timeframe, geo)
+                )
+                trend_data['stale'] = True
+        else:
+            self.cache.count('misses')
+            trend_data = self._coalesced_fetch(cache_key, keywords, timeframe, geo)
+        
+        # Popular keyword sets are pre-warmed before they expire
+        prewarm_scheduler.record(cache_key, ', '.join(keywords), TRENDS_PLATFORM, 0)
+        # Keyword order is not part of the key; answer in the order asked
+        return dict(trend_data, keywords=keywords)
+    
+    def refresh_trend_data(self, keywords: List[str], timeframe: str = 'today 12-m', geo: str = '') -> Dict:
+        """Fetch from upstream and replace the cache entry, whatever its age"""
+        return self._coalesced_fetch(trends_cache_key(keywords, timeframe, geo), keywords, timeframe, geo)
+    
+    def _coalesced_fetch(self, cache_key: str, keywords: List[str], timeframe: str, geo: str) -> Dict:
+        return single_flight.run(
+            flight_key('trends', cache_key),
+            lambda: self._fetch_and_cache(cache_key, keywords, timeframe, geo),
+            lookup=lambda: self.cache.get(cache_key)
+        )
+    
+    def _fetch_and_cache(self, cache_key: str, keywords: List[str], timeframe: str, geo: str) -> Dict:
+        previous = self.cache.get_live(cache_key)
+        trend_data, is_fallback = self._fetch_trend_data(keywords, timeframe, geo, previous)
         try:
-            self.pytrends = TrendReq(hl='en-US', tz=360, timeout=(10, 25), retries=2, backoff_factor=0.1)
+            self.cache.set(cache_key, trend_data, is_fallback)
         except Exception as e:
-            print(f"Error initializing pytrends: {e}")
-            self.pytrends = None
+            print(f"Error caching trend data: {e}")
+        return trend_data
     
-    def get_trend_data(self, keywords: List[str], timeframe: str = 'today 12-m') -> Dict:
-        """Get Google Trends data for keywords with fallback to mock data"""
-        # Limit to 5 keywords as per Google Trends API
-        keywords = keywords[:5]
-        
-        if not self.pytrends:
-            print("PyTrends not available, using mock data")
-            return self._generate_mock_trend_data(keywords, timeframe)
+    def _fetch_trend_data(self, keywords: List[str], timeframe: str, geo: str, previous: Dict = None):
+        """Query Google Trends; returns ``(trend_data, is_fallback)``
         
+        When the interest history is stored locally and ``previous`` (the
+        last live results for this key) is known, only the newest points are
+        fetched; see ``_fetch_from_history``.
+        """
+        self.cache.count('fetches')
         try:
             print(f"Attempting to get trends data for: {keywords}")
             
-            self.pytrends.build_payload(keywords, cat=0, timeframe=timeframe, geo='', gprop='')
-            
-            # Get interest over time
-            interest_over_time = self.pytrends.interest_over_time()
-            
-            # Get related queries (this might fail, so we'll handle it separately)
-            related_queries = {}
-            try:
-                related_queries = self.pytrends.related_queries()
-            except Exception as e:
-                print(f"Error getting related queries: {e}")
+            if previous and Config.TRENDS_SERIES_ENABLED:
+                from_history = self._fetch_from_history(keywords, timeframe, geo, previous)
+                if from_history is not None:
+                    return from_history
             
-            # Get interest by region (this might also fail)
-            interest_by_region = pd.DataFrame()
-            try:
-                interest_by_region = self.pytrends.interest_by_region(resolution='COUNTRY', inc_low_vol=True, inc_geo_code=False)
-            except Exception as e:
-                print(f"Error getting interest by region: {e}")
+            interest_over_time, related_queries, interest_by_region, unscaled = self._fetch_groups(
+                keywords, timeframe, geo
+            )
+            # Keywords missing from the frame would not fit the stored series
+            if Config.TRENDS_SERIES_ENABLED and not interest_over_time.empty and not unscaled:
+                window = timeframe_window(timeframe)
+                if window:
+                    self._store_history(keywords, geo, window[2], interest_over_time, full=True)
             
             # Process the data
             trend_data = {
@@ -51,19 +176,199 @@ class TrendsAnalyzer:
                 'interest_by_region': self._process_interest_by_region(interest_by_region),
                 'trend_analysis': self._analyze_trends(interest_over_time, keywords)
             }
+            if unscaled:
+                trend_data['unscaled_keywords'] = unscaled
             
             # If we got empty data, supplement with mock data
             if not trend_data['interest_over_time']:
                 print("No trend data received, using mock data")
-                return self._generate_mock_trend_data(keywords, timeframe)
+                return self._mock_fallback(keywords, timeframe)
             
             print(f"Successfully retrieved trends data for {len(keywords)} keywords")
-            return trend_data
+            return trend_data, False
             
         except Exception as e:
             print(f"Error getting trend data: {e}")
             print("Falling back to mock trend data")
-            return self._generate_mock_trend_data(keywords, timeframe)
+            return self._mock_fallback(keywords, timeframe)
+    
+    def _fetch_groups(self, keywords: List[str], timeframe: str, geo: str, optional: bool = True):
+        """Fetch keywords in anchored groups and merge them into one result
+        
+        The first five keywords go out first; the one with the most interest
+        in that response anchors the remaining groups, which are fetched in
+        parallel. Returns ``(interest_over_time, related_queries,
+        interest_by_region, unscaled_keywords)``; without ``optional`` only
+        interest over time is requested.
+        """
+        first = keywords[:MAX_KEYWORDS_PER_REQUEST]
+        results = [self._fetch_group(first, timeframe, geo, optional)]
+        anchor = choose_anchor(results[0][0], first)
+        groups = anchored_groups(anchor, keywords[MAX_KEYWORDS_PER_REQUEST:])
+        if groups and not results[0][0].empty:
+            # pytrends keeps the payload on the client, so each group checks out its own
+            with ThreadPoolExecutor(max_workers=min(len(groups), Config.TRENDS_MAX_WORKERS),
+                                    thread_name_prefix='trends-group') as pool:
+                futures = [pool.submit(self._fetch_group, group, timeframe, geo, optional) for group in groups]
+                results += [future.result() for future in futures]
+        
+        frames = [result[0] for result in results]
+        unscaled = []
+        if any(frame.empty for frame in frames):
+            interest_over_time = pd.DataFrame()
+        else:
+            interest_over_time, unscaled = merge_anchored_frames(frames, anchor)
+        
+        related_queries = {}
+        for result in results:
+            related_queries.update(result[1])
+        
+        region_frames = [result[2] for result in results if not result[2].empty]
+        interest_by_region = pd.DataFrame()
+        if region_frames:
+            interest_by_region = pd.concat(region_frames, axis=1)
+            interest_by_region = interest_by_region.loc[:, ~interest_by_region.columns.duplicated()]
+        
+        return interest_over_time, related_queries, interest_by_region, unscaled
+    
+    def _fetch_from_history(self, keywords: List[str], timeframe: str, geo: str,
+                            previous: Dict) -> Optional[Tuple[Dict, bool]]:
+        """Serve interest over time from the stored history, fetching only the delta
+        
+        The delta window starts ``TRENDS_SERIES_OVERLAP`` stored points back;
+        the store rescales the new points against those before splicing them
+        in. Related queries and regions have no history to splice and are
+        carried over from ``previous`` until the next full fetch. Returns
+        None when the history cannot serve this window.
+        """
+        window = timeframe_window(timeframe)
+        if window is None:
+            return None
+        first_day, last_day, step = window
+        series = self.history.get(keywords, geo, step)
+        if (series is None or series.start_day > first_day + step
+                or time.time() - series.full_fetched_at > Config.TRENDS_SERIES_FULL_REFRESH):
+            return None
+        
+        is_fallback = False
+        # Windows that end inside the history, or a series refreshed moments ago, need no upstream call
+        if last_day > series.end_day and time.time() - series.updated_at >= Config.TRENDS_SERIES_DELTA_INTERVAL:
+            delta_start = series.day_at(max(0, series.length - Config.TRENDS_SERIES_OVERLAP))
+            if last_day - delta_start > Config.TRENDS_SERIES_MAX_DELTA_DAYS:
+                return None
+            try:
+                delta, _, _, unscaled = self._fetch_groups(
+                    keywords, f"{from_days(delta_start)} {from_days(last_day)}", geo, optional=False
+                )
+                if unscaled:
+                    # A delta missing keywords cannot be spliced into the series
+                    delta = pd.DataFrame()
+            except Exception as e:
+                print(f"Error fetching trends delta: {e}")
+                delta = pd.DataFrame()
+            if delta.empty:
+                # Stored history short of the newest points beats mock data;
+                # cached as a fallback so it is retried soon
+                print("No trends delta received, serving stored history")
+                is_fallback = True
+            else:
+                self.history.count('delta_fetches')
+                series = self._store_history(keywords, geo, step, delta, full=False)
+                if series is None:
+                    return None
+        
+        days, values = self.history.read(series, first_day, last_day)
+        if not len(days):
+            return None
+        interest_over_time = normalize_peak(pd.DataFrame(
+            values.T, index=pd.DatetimeIndex(from_days(days), name='date'), columns=series.keywords
+        )[keywords])
+        
+        print(f"Served {len(days)} points for {len(keywords)} keywords from stored trends history")
+        return {
+            'keywords': keywords,
+            'interest_over_time': self._process_interest_over_time(interest_over_time),
+            'related_queries': previous.get('related_queries', {}),
+            'interest_by_region': previous.get('interest_by_region', []),
+            'trend_analysis': self._analyze_trends(interest_over_time, keywords)
+        }, is_fallback
+    
+    def _store_history(self, keywords: List[str], geo: str, step: int, frame: pd.DataFrame, full: bool):
+        """Write fetched interest over time into the history; returns the series or None"""
+        try:
+            days = to_days(frame.index.values)
+            # A full fetch at an unexpected resolution is not on the series' grid
+            if full and len(days) > 1 and int(np.median(np.diff(days))) != step:
+                return None
+            self.history.count('points_fetched', len(days))
+            return self.history.write(keywords, geo, step, days, frame[keywords].to_numpy(dtype=np.float64).T, full)
+        except Exception as e:
+            print(f"Error storing trends history: {e}")
+            return None
+    
+    def _fetch_group(self, keywords: List[str], timeframe: str, geo: str, optional: bool = True):
+        """One upstream request of at most five keywords; returns the raw pytrends results
+        
+        After the payload is built, interest over time, related queries and
+        interest by region are requested concurrently, each on its own copy
+        of the client and with its own deadline. Only interest over time is
+        required: a slow or failing related-queries or region call is logged
+        and left empty. Without ``optional`` only interest over time is sent.
+        """
+        # A failure in the required part evicts the pooled client
+        with self.sessions.session() as client:
+            # Trends requests share the outbound budget with the scrapers;
+            # building the payload is one request, each sub-query takes its own
+            rate_limiter.acquire(TRENDS_HOST)
+            client.build_payload(keywords, cat=0, timeframe=timeframe, geo=geo, gprop='')
+            
+            # pytrends mutates its widgets (interest_by_region sets the resolution),
+            # so every concurrent call works on a private copy of the client state
+            started = time.monotonic()
+            names = list(Config.TRENDS_SUBFETCH_TIMEOUTS) if optional else ['interest_over_time']
+            futures = {
+                name: _subfetch_executor.submit(self._subfetch, copy.deepcopy(client), name)
+                for name in names
+            }
+            
+            interest_over_time = self._subfetch_result(futures, 'interest_over_time', started, None)
+        
+        if not optional:
+            return interest_over_time, {}, pd.DataFrame()
+        related_queries = self._subfetch_result(futures, 'related_queries', started, {})
+        interest_by_region = self._subfetch_result(futures, 'interest_by_region', started, pd.DataFrame())
+        return interest_over_time, related_queries, interest_by_region
+    
+    @staticmethod
+    def _subfetch_result(futures: Dict, name: str, started: float, default):
+        """Wait for a sub-query until its deadline; optional ones (with a default) never raise"""
+        remaining = started + Config.TRENDS_SUBFETCH_TIMEOUTS[name] - time.monotonic()
+        try:
+            return futures[name].result(timeout=max(0, remaining))
+        except FutureTimeoutError:
+            if default is None:
+                raise
+            print(f"Trends {name} timed out, continuing without it")
+        except Exception as e:
+            if default is None:
+                raise
+            print(f"Error getting {name.replace('_', ' ')}: {e}")
+        return default
+    
+    @staticmethod
+    def _subfetch(client, name: str):
+        # pytrends sends related queries as one request per keyword
+        calls = len(getattr(client, 'related_queries_widget_list', None) or [None]) if name == 'related_queries' else 1
+        for _ in range(calls):
+            rate_limiter.acquire(TRENDS_HOST)
+        if name == 'interest_by_region':
+            return client.interest_by_region(resolution='COUNTRY', inc_low_vol=True, inc_geo_code=False)
+        return getattr(client, name)()
+    
+    def _mock_fallback(self, keywords: List[str], timeframe: str):
+        """Mock data served because upstream failed, counted separately from cache hits"""
+        self.cache.count('mock_fallbacks')
+        return self._generate_mock_trend_data(keywords, timeframe), True
     
     def _generate_mock_trend_data(self, keywords: List[str], timeframe: str = 'today 12-m') -> Dict:
         """Generate realistic mock trend data for testing"""
@@ -90,7 +395,7 @@ class TrendsAnalyzer:
             for keyword in keywords:
                 # Generate realistic trend patterns
                 base_interest = random.randint(20, 80)
-                seasonal_factor = 1 + 0.3 * random.sin(i * 0.1)  # Seasonal variation
+                seasonal_factor = 1 + 0.3 * math.sin(i * 0.1)  # Seasonal variation
                 noise = random.uniform(0.8, 1.2)  # Random noise
                 interest = max(0, min(100, int(base_interest * seasonal_factor * noise)))
                 entry[keyword] = interest
@@ -98,26 +403,8 @@ class TrendsAnalyzer:
             interest_data.append(entry)
         
         # Generate trend analysis
-        trend_analysis = {}
-        for keyword in keywords:
-            values = [entry[keyword] for entry in interest_data]
-            recent_avg = sum(values[-4:]) / 4 if len(values) >= 4 else values[-1]
-            older_avg = sum(values[:4]) / 4 if len(values) >= 4 else values[0]
-            
-            if recent_avg > older_avg * 1.1:
-                trend_direction = 'rising'
-            elif recent_avg < older_avg * 0.9:
-                trend_direction = 'falling'
-            else:
-                trend_direction = 'stable'
-            
-            trend_analysis[keyword] = {
-                'trend_direction': trend_direction,
-                'average_interest': sum(values) / len(values),
-                'max_interest': max(values),
-                'min_interest': min(values),
-                'volatility': pd.Series(values).std()
-            }
+        values = np.array([[entry[keyword] for entry in interest_data] for keyword in keywords])
+        trend_analysis = trend_analytics.summarize(keywords, values, [entry['date'] for entry in interest_data])
         
         # Generate related queries
         related_queries = {}
@@ -154,15 +441,12 @@ class TrendsAnalyzer:
         if 'isPartial' in df.columns:
             df = df.drop('isPartial', axis=1)
         
-        # Convert to list of dictionaries
-        data = []
-        for index, row in df.iterrows():
-            entry = {'date': index.strftime('%Y-%m-%d')}
-            for keyword in df.columns:
-                entry[keyword] = int(row[keyword])
-            data.append(entry)
-        
-        return data
+        # Format all dates and convert whole columns at once; only the final
+        # row dicts are built in Python
+        keys = ['date'] + list(df.columns)
+        dates = df.index.strftime('%Y-%m-%d').tolist()
+        columns = [df[keyword].to_numpy().astype(np.int64).tolist() for keyword in df.columns]
+        return [dict(zip(keys, values)) for values in zip(dates, *columns)]
     
     def _process_related_queries(self, related_queries: Dict) -> Dict:
         """Process related queries data"""
@@ -179,54 +463,36 @@ class TrendsAnalyzer:
         if df.empty:
             return []
         
-        # Get top 10 regions
+        # The 10th-largest value of every keyword comes from one partition
+        # over the regions x keywords matrix; only regions at or above it are
+        # sorted, stably, so ties keep row order as nlargest does
+        values = df.to_numpy(dtype=np.float64)
+        values = np.where(np.isnan(values), -np.inf, values)
+        k = min(10, len(values))
+        thresholds = -np.partition(-values, k - 1, axis=0)[k - 1]
+        regions = df.index.to_numpy()
+        
         data = []
-        for keyword in df.columns:
-            top_regions = df[keyword].nlargest(10)
-            for region, value in top_regions.items():
+        for column, keyword in enumerate(df.columns):
+            interest = values[:, column]
+            rows = np.flatnonzero(interest >= thresholds[column])
+            rows = rows[np.argsort(-interest[rows], kind='stable')][:k]
+            # Regions without data are skipped rather than failing int()
+            rows = rows[np.isfinite(interest[rows])]
+            for region, value in zip(regions[rows].tolist(), interest[rows].astype(np.int64).tolist()):
                 data.append({
                     'keyword': keyword,
                     'region': region,
-                    'interest': int(value)
+                    'interest': value
                 })
         
         return data
     
     def _analyze_trends(self, df: pd.DataFrame, keywords: List[str]) -> Dict:
-        """Analyze trend patterns"""
-        analysis = {}
-        
+        """Analyze trend patterns for all keywords in one batch"""
         if df.empty:
-            return analysis
+            return {}
         
-        # Remove 'isPartial' column if it exists
-        if 'isPartial' in df.columns:
-            df = df.drop('isPartial', axis=1)
-        
-        for keyword in keywords:
-            if keyword in df.columns:
-                values = df[keyword].values
-                
-                # Calculate trend direction
-                if len(values) >= 2:
-                    recent_avg = values[-4:].mean() if len(values) >= 4 else values[-1]
-                    older_avg = values[:4].mean() if len(values) >= 4 else values[0]
-                    
-                    if recent_avg > older_avg * 1.1:
-                        trend_direction = 'rising'
-                    elif recent_avg < older_avg * 0.9:
-                        trend_direction = 'falling'
-                    else:
-                        trend_direction = 'stable'
-                else:
-                    trend_direction = 'stable'
-                
-                analysis[keyword] = {
-                    'trend_direction': trend_direction,
-                    'average_interest': float(values.mean()),
-                    'max_interest': int(values.max()),
-                    'min_interest': int(values.min()),
-                    'volatility': float(values.std())
-                }
-        
-        return analysis
\ No newline at end of file
+        present = [keyword for keyword in keywords if keyword in df.columns]
+        values = df[present].to_numpy(dtype=np.float64).T
+        return trend_analytics.summarize(present, values, df.index.strftime('%Y-%m-%d').tolist())
@@ -0,0 +1,142 @@
+"""
+Pool of ready-to-use pytrends clients
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from config import Config
+from app.services.background import PeriodicJob
+
+
+class _PooledClient:
+    __slots__ = ('client', 'cookie_time')
+
+    def __init__(self, client):
+        self.client = client
+        self.cookie_time = time.time()
+
+
+class TrendsSessionPool:
+    """Reusable ``TrendReq`` clients whose Google cookie handshake is already done
+
+    Constructing a ``TrendReq`` fetches a cookie from Google, which used to
+    be paid on every request. Clients are created and topped up by a
+    background thread, checked out per upstream request, and returned
+    afterwards. Idle clients older than ``TRENDS_SESSION_MAX_AGE`` get a fresh
+    cookie in the background; a client whose request raised is discarded
+    rather than returned, since the failure is often a rejected cookie.
+    """
+
+    def __init__(self, size: int = None, max_age: float = None, interval: float = None):
+        self.size = size if size is not None else Config.TRENDS_SESSION_POOL_SIZE
+        self.max_age = max_age or Config.TRENDS_SESSION_MAX_AGE
+        self.interval = interval or Config.TRENDS_SESSION_REFRESH_INTERVAL
+        self.lock = threading.Lock()
+        self.idle: List[_PooledClient] = []
+        self.worker = PeriodicJob('trends-sessions', self.maintain, lambda: self.interval,
+                                  'trends session maintenance', run_first=True)
+        self.stats = {
+            'created': 0, 'create_errors': 0, 'checkouts': 0, 'cold_checkouts': 0,
+            'refreshed': 0, 'evicted': 0, 'discarded': 0
+        }
+
+    @staticmethod
+    def create_client():
+        """New client; runs the cookie handshake
+
+        pytrends' own retries are left off: with urllib3 2 its Retry setup
+        raises on every request. Failed requests fall back to mock data and
+        evict the client instead.
+        """
+        # Imported on first use: pytrends pulls in pandas
+        from pytrends.request import TrendReq
+        return TrendReq(hl='en-US', tz=360, timeout=(10, 25))
+
+    def _count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def ensure_started(self):
+        self.worker.ensure_started()
+
+    def maintain(self) -> Dict:
+        """Refresh stale cookies on idle clients, then top the pool up to ``size``"""
+        now = time.time()
+        with self.lock:
+            stale = [pooled for pooled in self.idle if now - pooled.cookie_time >= self.max_age]
+            # Out of the pool while refreshing, so no request gets a half-updated client
+            self.idle = [pooled for pooled in self.idle if pooled not in stale]
+
+        refreshed = 0
+        for pooled in stale:
+            try:
+                pooled.client.cookies = pooled.client.GetGoogleCookie()
+                pooled.cookie_time = time.time()
+                refreshed += 1
+                self._release(pooled)
+            except Exception as e:
+                print(f"Error refreshing trends session cookie: {e}")
+                self._count('evicted')
+        self._count('refreshed', refreshed)
+
+        created = 0
+        while len(self.idle) < self.size:
+            try:
+                pooled = _PooledClient(self.create_client())
+            except Exception as e:
+                # Google unreachable; retry on the next round rather than spinning
+                print(f"Error creating trends session: {e}")
+                self._count('create_errors')
+                break
+            self._count('created')
+            created += 1
+            self._release(pooled)
+        return {'refreshed': refreshed, 'created': created}
+
+    def _acquire(self) -> _PooledClient:
+        with self.lock:
+            self.stats['checkouts'] += 1
+            if self.idle:
+                return self.idle.pop()
+            self.stats['cold_checkouts'] += 1
+        # Pool empty (cold start or burst): pay the handshake in this request
+        pooled = _PooledClient(self.create_client())
+        self._count('created')
+        return pooled
+
+    def _release(self, pooled: _PooledClient):
+        with self.lock:
+            if len(self.idle) < max(self.size, 1):
+                self.idle.append(pooled)
+                return
+            self.stats['discarded'] += 1
+
+    @contextmanager
+    def session(self):
+        """Check out a client for one upstream request"""
+        self.ensure_started()
+        pooled = self._acquire()
+        try:
+            yield pooled.client
+        except Exception:
+            self._count('evicted')
+            raise
+        self._release(pooled)
+
+    def get_stats(self) -> Dict:
+        now = time.time()
+        with self.lock:
+            stats = dict(self.stats)
+            ages = [now - pooled.cookie_time for pooled in self.idle]
+        stats.update({
+            'size': self.size,
+            'idle': len(ages),
+            'oldest_cookie_age': round(max(ages), 1) if ages else None
+        })
+        return stats
+
+
+# Global instance
+trends_session_pool = TrendsSessionPool()
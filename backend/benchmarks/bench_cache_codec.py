@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compare the cached-result encoding against plain JSON: bytes stored and encode/decode time
+"""
+
+import sys
+import os
+import json
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.scraper import MarketplaceScraper
+from app.models import cache_codec
+
+QUERIES = ['wireless earbuds', 'kitchen gadgets', 'gym gear', 'yoga mat', 'phone case',
+           'desk lamp', 'fitness tracker', 'coffee grinder', 'bluetooth speaker', 'standing desk']
+
+
+def build_result_sets():
+    """Result sets shaped like what the search route caches: scraped rows plus mock fill"""
+    scraper = MarketplaceScraper()
+    result_sets = []
+    for round_index in range(20):
+        for query in QUERIES:
+            for platform in ('Amazon', 'eBay'):
+                scraped = [{
+                    'title': f"{query.title()} Model {round_index}-{i} with Extra Accessories",
+                    'price': round(19.99 + i * 3.5, 2),
+                    'rating': 4.0 + (i % 10) / 10 if platform == 'Amazon' else 0,
+                    'reviews_count': 1000 + i * 137 if platform == 'Amazon' else 0,
+                    'platform': platform,
+                    'url': f"https://www.{platform.lower()}.com/dp/B0{round_index:03d}{i:05d}",
+                    'search_query': query,
+                    'seller': 'Amazon Seller'
+                } for i in range(15)]
+                result_sets.append(scraped + scraper._generate_mock_data(query, platform, 5))
+    return result_sets
+
+
+def timed(fn, items, rounds=3):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        out = [fn(item) for item in items]
+    return out, (time.perf_counter() - start) / rounds * 1000
+
+
+if __name__ == "__main__":
+    result_sets = build_result_sets()
+    json_blobs, json_encode_ms = timed(json.dumps, result_sets)
+    _, json_decode_ms = timed(json.loads, json_blobs)
+    json_bytes = sum(len(blob.encode('utf-8')) for blob in json_blobs)
+
+    print(f"{len(result_sets)} result sets")
+    print(f"  json      {json_bytes:>9,} bytes  encode {json_encode_ms:6.1f} ms  decode {json_decode_ms:6.1f} ms")
+
+    for compression in ('none', 'zlib', 'zstd'):
+        if compression == 'zstd' and cache_codec.zstandard is None:
+            print("  zstd      (zstandard not installed)")
+            continue
+        blobs, encode_ms = timed(lambda products: cache_codec.encode(products, compression), result_sets)
+        decoded, decode_ms = timed(cache_codec.decode, blobs)
+        assert decoded == result_sets
+        size = sum(len(blob) for blob in blobs)
+        print(f"  {compression:8s}  {size:>9,} bytes  encode {encode_ms:6.1f} ms  decode {decode_ms:6.1f} ms"
+              f"  ({size / json_bytes:.0%} of json)")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Drive AIAnalyzer's OpenAI path against a local fake completion server
+
+Three scenarios: a burst of analyses against a server that answers in
+0.5 s (the in-flight cap must hold), a server slower than the deadline
+(every call must fall back to local analysis at the deadline), and a burst
+larger than the token budget (calls queue for budget, and those that cannot
+get it in time fall back at once).
+
+Usage: python benchmarks/bench_openai_client.py
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+os.environ['OPENAI_API_KEY'] = 'test-key'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import ai_analyzer
+from app.services.openai_client import AsyncCompletionClient
+
+PRODUCTS = [{'platform': 'Amazon', 'price': 20 + i, 'rating': 4.2, 'reviews_count': 300} for i in range(20)]
+
+
+class FakeCompletions(BaseHTTPRequestHandler):
+    """POST /v1/chat/completions: sleeps ``delay`` then answers with fixed usage"""
+
+    delay = 0.5
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    served = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            time.sleep(cls.delay)
+            body = json.dumps({
+                'id': 'chatcmpl-fake', 'object': 'chat.completion', 'created': int(time.time()),
+                'model': 'gpt-3.5-turbo',
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {
+                    'role': 'assistant',
+                    'content': 'Demand is steady and competition is moderate. Prices cluster tightly around the median.'
+                }}],
+                'usage': {'prompt_tokens': 150, 'completion_tokens': 250, 'total_tokens': 400}
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up at its deadline
+        finally:
+            with cls.lock:
+                cls.active -= 1
+                cls.served += 1
+
+    def log_message(self, *args):
+        pass
+
+
+def burst(calls, concurrency):
+    """Run ``calls`` analyses from ``concurrency`` request threads; returns latencies and result types"""
+    def one(_):
+        start = time.perf_counter()
+        result = ai_analyzer.AIAnalyzer().analyze_products(PRODUCTS)
+        return time.perf_counter() - start, result['analysis_type']
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(calls)))
+    return time.perf_counter() - start, np.array([r[0] for r in results]), [r[1] for r in results]
+
+
+def scenario(name, base_url, delay, calls, concurrency, **client_options):
+    # Handlers abandoned at a previous scenario's deadline are still sleeping
+    while FakeCompletions.active:
+        time.sleep(0.05)
+    FakeCompletions.delay, FakeCompletions.peak, FakeCompletions.served = delay, 0, 0
+    client = AsyncCompletionClient(api_key='test-key', base_url=base_url, **client_options)
+    ai_analyzer.openai_client = client
+    wall, latencies, kinds = burst(calls, concurrency)
+    stats = client.get_stats()
+    print(f"{name}")
+    print(f"  {calls} analyses from {concurrency} threads in {wall:.2f} s;"
+          f" latency p50 {np.percentile(latencies, 50):.2f} s  max {latencies.max():.2f} s")
+    print(f"  openai {kinds.count('openai')}  local fallback {kinds.count('textblob')};"
+          f" peak in flight: client {stats['max_in_flight_seen']}, server {FakeCompletions.peak}"
+          f" (cap {client.max_in_flight})")
+    print(f"  client stats: completed {stats['completed']}  timeouts {stats['timeouts']}"
+          f"  budget_waits {stats['budget_waits']}  over_budget {stats['over_budget']}"
+          f"  tokens_used {stats['tokens_used']}")
+    return stats, kinds
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeCompletions)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    stats, kinds = scenario('capped burst', base_url, delay=0.5, calls=32, concurrency=32,
+                            max_in_flight=4, timeout=10, tokens_per_minute=10_000_000, token_burst=1_000_000)
+    assert FakeCompletions.peak <= 4 and kinds.count('openai') == 32
+
+    stats, kinds = scenario('server slower than the deadline', base_url, delay=5, calls=8, concurrency=8,
+                            max_in_flight=4, timeout=1, tokens_per_minute=10_000_000, token_burst=1_000_000)
+    assert kinds.count('textblob') == 8 and stats['max_in_flight_seen'] <= 4
+
+    # ~1,300 tokens per call: the burst allowance covers 4 calls, the refill one more every ~2 s
+    stats, kinds = scenario('burst over the token budget', base_url, delay=0.1, calls=12, concurrency=12,
+                            max_in_flight=8, timeout=5, tokens_per_minute=40_000, token_burst=5_500)
+    assert stats['over_budget'] > 0 and stats['budget_waits'] > 0
+    server.shutdown()
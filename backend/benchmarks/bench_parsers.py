@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark the HTML extraction backends on synthetic marketplace result pages
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.html_extract import extract_products, extract_products_streaming, SoupBackend, get_backend
+
+AMAZON_RESULT = '''
+<div data-component-type="s-search-result" data-asin="B0{i:08d}" class="s-result-item s-asin">
+  <div class="s-card-container">
+    <h2 class="a-size-mini"><a class="a-link-normal" href="/dp/B0{i:08d}?ref=sr_1_{i}">
+      <span class="a-size-medium a-text-normal">Wireless Earbuds Model {i} with Charging Case</span></a></h2>
+    <div class="a-row"><span class="a-icon-alt">4.{r} out of 5 stars</span>
+      <span class="a-size-base s-underline-text">{reviews:,}</span></div>
+    <span class="a-price"><span class="a-offscreen">${price}.99</span>
+      <span class="a-price-whole">{price}.</span><span class="a-price-fraction">99</span></span>
+  </div>
+</div>
+'''
+
+EBAY_RESULT = '''
+<li class="s-item"><div class="s-item__wrapper clearfix">
+  <a class="s-item__link" href="https://www.ebay.com/itm/{i}">
+    <div class="s-item__title"><span role="heading">Bluetooth Headphones Lot {i}</span></div></a>
+  <div class="s-item__details"><span class="s-item__price">${price}.50 to ${price2}.00</span></div>
+</div></li>
+'''
+
+# Navigation, scripts and styling that surround the results on a real page
+FILLER = '<div class="nav-item"><a href="/n/{i}">Department {i}</a><script>var x{i} = {{"k": "{pad}"}};</script></div>\n'
+
+
+def build_page(template: str, results: int, target_bytes: int) -> bytes:
+    body = [template.format(i=i, r=i % 10, reviews=1000 + i * 37, price=20 + i, price2=40 + i)
+            for i in range(results)]
+    filler = []
+    size = sum(len(b) for b in body)
+    i = 0
+    while size < target_bytes:
+        chunk = FILLER.format(i=i, pad='x' * 200)
+        filler.append(chunk)
+        size += len(chunk)
+        i += 1
+    # Results sit in the middle of the page, after the header navigation
+    half = len(filler) // 2
+    html = ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>Results</title></head><body>'
+            + ''.join(filler[:half]) + '<div class="s-main-slot">' + ''.join(body) + '</div>'
+            + ''.join(filler[half:]) + '</body></html>')
+    return html.encode('utf-8')
+
+
+def bench(name: str, content: bytes, platform: str, max_results: int, rounds: int = 5):
+    backends = [('bs4', SoupBackend()), ('lxml', get_backend('lxml'))]
+    results = {}
+    timings = {}
+    for label, backend in backends:
+        extract_products(content, platform, 'bench', max_results, backend=backend)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results[label] = extract_products(content, platform, 'bench', max_results, backend=backend)
+        timings[label] = (time.perf_counter() - start) / rounds * 1000
+
+    identical = results['bs4'] == results['lxml']
+    print(f"{name}: {len(content) / 1e6:.1f} MB, {len(results['lxml'])} products, identical={identical}")
+    for label, ms in timings.items():
+        print(f"  {label:5s} {ms:8.1f} ms")
+    print(f"  speedup {timings['bs4'] / timings['lxml']:.1f}x")
+
+    # Streaming: feed the page in 64 KB chunks and stop once enough products are found
+    chunks = [content[i:i + 65536] for i in range(0, len(content), 65536)]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        streamed, bytes_read = extract_products_streaming(iter(chunks), platform, 'bench', max_results)
+    streaming_ms = (time.perf_counter() - start) / rounds * 1000
+    print(f"  stream {streaming_ms:7.1f} ms, read {bytes_read / 1e6:.2f} of {len(content) / 1e6:.2f} MB, "
+          f"{len(streamed)} products")
+
+
+if __name__ == "__main__":
+    bench('Amazon', build_page(AMAZON_RESULT, 60, 1_600_000), 'Amazon', 20)
+    bench('eBay', build_page(EBAY_RESULT, 60, 1_600_000), 'eBay', 20)
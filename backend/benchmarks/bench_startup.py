@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Measure worker cold start: app import, and the first request to each blueprint
+
+Every blueprint is measured in a fresh interpreter, so its first request
+pays for whatever that route imports lazily. Background jobs are off for
+those runs; a last run keeps the default config (trends session pool and
+pre-warming on) to time the startup a real worker does. Exits non-zero when any
+measurement exceeds its budget; budgets are milliseconds and can be
+overridden per key, e.g. ``STARTUP_BUDGET_CREATE_APP=500``.
+
+Usage: python benchmarks/bench_startup.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cheap requests that still go through each blueprint's imports: invalid
+# bodies are rejected before any scraping or Google Trends traffic
+SCENARIOS = {
+    'health': ('GET', '/api/health', None),
+    'search': ('POST', '/api/search/products', {}),
+    'trends': ('POST', '/api/trends/analyze', {}),
+    'analysis': ('POST', '/api/analysis/opportunity', {}),
+    'chat': ('POST', '/api/chat/process', {}),
+}
+
+# Milliseconds; create_app covers importing the app and registering every blueprint
+BUDGETS = {
+    'create_app': 600,
+    'health': 50,
+    'search': 50,
+    'trends': 50,
+    'analysis': 50,
+    'chat': 100,
+    'trends_import': 1500,
+    'defaults': 50,
+}
+
+# Runs in the child interpreter; prints one JSON line of timings
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+app = create_app()
+timings = {'create_app': (time.perf_counter() - start) * 1000}
+heavy = ('pandas', 'numpy', 'pytrends', 'openai', 'textblob', 'bs4', 'requests')
+timings['loaded_at_start'] = [name for name in heavy if name in sys.modules]
+# Background jobs started by create_app compete with the first request
+import threading
+timings['threads_at_start'] = [thread.name for thread in threading.enumerate() if thread is not threading.main_thread()]
+method, path, body = json.loads(sys.argv[1])
+client = app.test_client()
+start = time.perf_counter()
+client.open(path, method=method, json=body)
+timings['request'] = (time.perf_counter() - start) * 1000
+timings['loaded'] = [name for name in heavy if name in sys.modules]
+if sys.argv[2] == 'isolated':
+    # Cost moved off startup: the first request that needs Google Trends pays it
+    start = time.perf_counter()
+    import app.services.trends
+    timings['trends_import'] = (time.perf_counter() - start) * 1000
+print(json.dumps(timings))
+'''
+
+
+def budget(key):
+    return float(os.getenv(f"STARTUP_BUDGET_{key.upper()}", BUDGETS[key]))
+
+
+def measure(scenario, db_path, isolated=True):
+    """Timings for one scenario; ``isolated`` turns the background jobs off"""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", PYTHONPATH=BACKEND_DIR)
+    if isolated:
+        env.update(PREWARM_ENABLED='false', TRENDS_SESSION_POOL_SIZE='0')
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD, json.dumps(SCENARIOS[scenario]), 'isolated' if isolated else 'defaults'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # Background jobs may still log while the child shuts down
+    return json.loads([line for line in out.splitlines() if line.startswith('{')][-1])
+
+
+if __name__ == "__main__":
+    over = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Throwaway run so schema creation and .pyc compilation don't count
+        measure('health', os.path.join(tmp, 'bench.db'))
+
+        for scenario in SCENARIOS:
+            timings = measure(scenario, os.path.join(tmp, 'bench.db'))
+            checks = [('create_app', timings['create_app']), (scenario, timings['request'])]
+            print(f"{scenario:9s} create_app {timings['create_app']:7.1f} ms  first request {timings['request']:7.1f} ms"
+                  f"  loaded: {', '.join(timings['loaded']) or '-'}")
+            if scenario == 'trends':
+                checks.append(('trends_import', timings['trends_import']))
+                print(f"{'':9s} deferred trends service import {timings['trends_import']:7.1f} ms")
+            over += [(key, value) for key, value in checks if value > budget(key)]
+
+        # Default config: the session pool must not start warming until a request is served
+        timings = measure('health', os.path.join(tmp, 'bench.db'), isolated=False)
+        print(f"{'defaults':9s} create_app {timings['create_app']:7.1f} ms  first request {timings['request']:7.1f} ms"
+              f"  loaded at start: {', '.join(timings['loaded_at_start']) or '-'}"
+              f"  threads at start: {', '.join(timings['threads_at_start']) or '-'}")
+        checks = [('create_app', timings['create_app']), ('defaults', timings['request'])]
+        over += [(key, value) for key, value in checks if value > budget(key)]
+
+    for key, value in over:
+        print(f"OVER BUDGET: {key} took {value:.1f} ms (budget {budget(key):.0f} ms)")
+    sys.exit(1 if over else 0)
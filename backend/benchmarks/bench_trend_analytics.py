@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Time the batch trend analytics engine against the old per-keyword summary loop
+
+Usage: python benchmarks/bench_trend_analytics.py
+"""
+
+import sys
+import os
+import time
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import trend_analytics
+
+# (keywords, points): a 5-keyword request, 5 years of daily data, and batch jobs
+SHAPES = [(5, 52), (5, 1826), (100, 260), (500, 260), (1000, 1826)]
+
+
+def legacy_summary(values):
+    """The previous _analyze_trends body: basic stats only, one keyword at a time"""
+    analysis = {}
+    for i, row in enumerate(values):
+        recent_avg = row[-4:].mean() if len(row) >= 4 else row[-1]
+        older_avg = row[:4].mean() if len(row) >= 4 else row[0]
+        if recent_avg > older_avg * 1.1:
+            direction = 'rising'
+        elif recent_avg < older_avg * 0.9:
+            direction = 'falling'
+        else:
+            direction = 'stable'
+        analysis[i] = {
+            'trend_direction': direction,
+            'average_interest': float(row.mean()),
+            'max_interest': int(row.max()),
+            'min_interest': int(row.min()),
+            'volatility': float(row.std())
+        }
+    return analysis
+
+
+def synthetic_interest(keywords, points, rng):
+    """Trend + yearly cycle + noise with occasional spikes, clipped to 0-100"""
+    t = np.arange(points)
+    trend = rng.uniform(-0.05, 0.05, (keywords, 1)) * t
+    cycle = rng.uniform(0, 15, (keywords, 1)) * np.sin(2 * np.pi * t / 52 + rng.uniform(0, 6, (keywords, 1)))
+    values = 50 + trend + cycle + rng.normal(0, 5, (keywords, points))
+    values[rng.random((keywords, points)) < 0.01] += 40
+    return np.clip(values, 0, 100).round()
+
+
+def timed(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        out = fn()
+    return out, (time.perf_counter() - start) / rounds * 1000
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(3)
+    for keywords, points in SHAPES:
+        values = synthetic_interest(keywords, points, rng)
+        names = [f"keyword {i}" for i in range(keywords)]
+
+        old, old_ms = timed(lambda: legacy_summary(values), 5)
+        new, new_ms = timed(lambda: trend_analytics.summarize(names, values), 5)
+        for i, name in enumerate(names):
+            for field, value in old[i].items():
+                assert np.isclose(new[name][field], value) if isinstance(value, float) else new[name][field] == value
+
+        spikes = sum(len(entry['spikes']) for entry in new.values())
+        print(f"{keywords:5d} keywords x {points:5d} points  legacy (5 stats) {old_ms:8.2f} ms"
+              f"  batch (all metrics) {new_ms:8.2f} ms  {spikes} spikes")
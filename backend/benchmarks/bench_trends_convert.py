@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compare the vectorized Google Trends DataFrame converters against the row-by-row originals
+
+Usage: python benchmarks/bench_trends_convert.py
+"""
+
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.trends import TrendsAnalyzer
+
+KEYWORDS = ['wireless earbuds', 'bluetooth headphones', 'airpods', 'gym gear', 'yoga mat']
+SIZES = [1_000, 10_000, 100_000]
+
+
+def legacy_interest_over_time(df):
+    if df.empty:
+        return []
+    if 'isPartial' in df.columns:
+        df = df.drop('isPartial', axis=1)
+    data = []
+    for index, row in df.iterrows():
+        entry = {'date': index.strftime('%Y-%m-%d')}
+        for keyword in df.columns:
+            entry[keyword] = int(row[keyword])
+        data.append(entry)
+    return data
+
+
+def legacy_interest_by_region(df):
+    if df.empty:
+        return []
+    data = []
+    for keyword in df.columns:
+        top_regions = df[keyword].nlargest(10)
+        for region, value in top_regions.items():
+            data.append({'keyword': keyword, 'region': region, 'interest': int(value)})
+    return data
+
+
+def interest_frame(rows, rng):
+    """Daily 0-100 series like pytrends returns, including the isPartial flag"""
+    index = pd.date_range('1900-01-01', periods=rows, freq='D', name='date')
+    df = pd.DataFrame({keyword: rng.integers(0, 101, rows) for keyword in KEYWORDS}, index=index)
+    df['isPartial'] = False
+    return df
+
+
+def region_frame(rows, rng):
+    """Low-cardinality values so top-10 selection has to break plenty of ties"""
+    index = pd.Index([f"Region {i}" for i in range(rows)], name='geoName')
+    return pd.DataFrame({keyword: rng.integers(0, 40, rows) for keyword in KEYWORDS}, index=index)
+
+
+def timed(fn, df, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        out = fn(df)
+    return out, (time.perf_counter() - start) / rounds * 1000
+
+
+if __name__ == "__main__":
+    analyzer = TrendsAnalyzer()
+    rng = np.random.default_rng(42)
+
+    for rows in SIZES:
+        rounds = 3 if rows >= 100_000 else 10
+        print(f"{rows:,} rows x {len(KEYWORDS)} keywords")
+
+        df = interest_frame(rows, rng)
+        old, old_ms = timed(legacy_interest_over_time, df, rounds)
+        new, new_ms = timed(analyzer._process_interest_over_time, df, rounds)
+        assert new == old, "interest_over_time output changed"
+        print(f"  interest_over_time   iterrows {old_ms:9.1f} ms  vectorized {new_ms:8.1f} ms  ({old_ms / new_ms:5.1f}x)")
+
+        df = region_frame(rows, rng)
+        old, old_ms = timed(legacy_interest_by_region, df, rounds)
+        new, new_ms = timed(analyzer._process_interest_by_region, df, rounds)
+        assert new == old, "interest_by_region output changed"
+        print(f"  interest_by_region   nlargest {old_ms:9.1f} ms  vectorized {new_ms:8.1f} ms  ({old_ms / new_ms:5.1f}x)")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Replay a month of daily trends refreshes against a simulated Google Trends
+
+Each simulated day refreshes ``today 12-m`` and ``today 5-y`` for one
+keyword set, once with the stored history (delta fetches) and once as plain
+full fetches, and reports the points requested from upstream and how far
+the spliced series drift from what a full fetch returns. Also times range
+reads from a long memory-mapped series against loading the whole file.
+
+Usage: python benchmarks/bench_trends_history.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+WORKDIR = tempfile.mkdtemp(prefix='trends-history-')
+os.environ.update({
+    'DATABASE_URL': f"sqlite:///{os.path.join(WORKDIR, 'bench.db')}",
+    'REQUESTS_PER_MINUTE': '1000000',
+    'RATE_LIMIT_BURST': '1000000',
+    'PREWARM_ENABLED': 'false',
+    'TRENDS_SESSION_POOL_SIZE': '0',
+    'TRENDS_SERIES_DELTA_INTERVAL': '0',
+    'TRENDS_SERIES_FULL_REFRESH': str(365 * 24 * 60 * 60),
+})
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from app.models import trends_series
+from app.services.trends import TrendsAnalyzer
+
+KEYWORDS = ['yoga mat', 'resistance bands', 'foam roller']
+DAYS = 28
+START = date(2025, 1, 6)
+
+
+class SimulatedDate(date):
+    today_value = START
+
+    @classmethod
+    def today(cls):
+        return cls.today_value
+
+
+def true_interest(days, rng):
+    """Daily search volume: trend, yearly cycle, noise and one viral week per keyword"""
+    t = np.arange(days)
+    volume = []
+    for i in range(len(KEYWORDS)):
+        series = 40 + 0.01 * (i + 1) * t + 12 * np.sin(2 * np.pi * t / 365.25 + i) + rng.normal(0, 3, days)
+        series[rng.integers(0, days - 7):][:7] += 60
+        volume.append(np.clip(series, 1, None))
+    return np.array(volume)
+
+
+class FakeTrendReq:
+    """Answers like Google: resolution from the window length, peak scaled to 100, integers"""
+
+    def __init__(self, truth, origin, counter):
+        self.truth, self.origin, self.counter = truth, origin, counter
+
+    def __deepcopy__(self, memo):
+        # The analyzer copies clients per sub-query; keep counting into one place
+        clone = FakeTrendReq(self.truth, self.origin, self.counter)
+        clone.__dict__.update(self.__dict__)
+        return clone
+
+    def build_payload(self, keywords, cat=0, timeframe='', geo='', gprop=''):
+        self.keywords = keywords
+        self.window = trends_series.timeframe_window(timeframe, SimulatedDate.today())
+
+    def interest_over_time(self):
+        first, last, step = self.window
+        days = np.arange(first, last + 1)
+        rows = np.array([self.truth[KEYWORDS.index(k)][days - self.origin] for k in self.keywords])
+        if step == 7:
+            # Weeks start on Sunday, as Google's do
+            sunday = first - (first + 4) % 7
+            days, rows = trends_series.resample(days, rows, sunday, 7)
+            days = sunday + days * 7
+        rows = np.round(rows * (100.0 / rows.max()))
+        self.counter['points'] += rows.shape[1]
+        frame = pd.DataFrame(rows.T.astype(int), index=pd.DatetimeIndex(trends_series.from_days(days), name='date'),
+                             columns=self.keywords)
+        frame['isPartial'] = False
+        return frame
+
+    def related_queries(self):
+        return {k: {'top': None, 'rising': None} for k in self.keywords}
+
+    def interest_by_region(self, **kwargs):
+        return pd.DataFrame()
+
+
+class FakePool:
+    def __init__(self, client):
+        self.client = client
+
+    @contextmanager
+    def session(self):
+        yield self.client
+
+
+def replay(use_history, truth, origin):
+    Config.TRENDS_SERIES_ENABLED = use_history
+    counter = {'points': 0}
+    analyzer = TrendsAnalyzer()
+    analyzer.sessions = FakePool(FakeTrendReq(truth, origin, counter))
+    results = {}
+    for day in range(DAYS):
+        SimulatedDate.today_value = START + timedelta(days=day)
+        for timeframe in ('today 12-m', 'today 5-y'):
+            results[day, timeframe] = analyzer.refresh_trend_data(KEYWORDS, timeframe)
+    return counter['points'], results
+
+
+def range_reads():
+    store = trends_series.TrendsSeriesStore(directory=os.path.join(WORKDIR, 'long'))
+    points = 2_000_000
+    days = np.arange(points)
+    values = np.random.default_rng(1).uniform(1, 100, (len(KEYWORDS), points))
+    series = store.write(KEYWORDS, '', 1, days, values, full=True)
+
+    start = time.perf_counter()
+    for _ in range(20):
+        store.read(series, points - 365)
+    mapped_ms = (time.perf_counter() - start) / 20 * 1000
+    start = time.perf_counter()
+    for _ in range(20):
+        np.load(series.file)[:, -365:]
+    full_ms = (time.perf_counter() - start) / 20 * 1000
+    size_mb = os.path.getsize(series.file) / 1e6
+    print(f"last 365 of {points:,} points ({size_mb:.0f} MB file): mmap range read {mapped_ms:.2f} ms,"
+          f" full load {full_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    trends_series.date = SimulatedDate
+    rng = np.random.default_rng(7)
+    origin = int(trends_series.to_days((START - timedelta(days=6 * 366)).isoformat()))
+    truth = true_interest(7 * 366, rng)
+
+    full_points, full = replay(False, truth, origin)
+    delta_points, spliced = replay(True, truth, origin)
+
+    errors = []
+    for key, expected in full.items():
+        got = {row['date']: row for row in spliced[key]['interest_over_time']}
+        for row in expected['interest_over_time']:
+            if row['date'] in got:
+                errors.extend(abs(got[row['date']][k] - row[k]) for k in KEYWORDS)
+    errors = np.array(errors)
+    print(f"{DAYS} days x 2 timeframes x {len(KEYWORDS)} keywords")
+    print(f"  upstream points  full fetches {full_points:7,}  with history {delta_points:7,}"
+          f"  ({full_points / delta_points:.1f}x fewer)")
+    print(f"  spliced vs full fetch  mean |error| {errors.mean():.2f}  p99 {np.percentile(errors, 99):.0f}"
+          f"  max {errors.max():.0f}  (0-100 scale)")
+    print(f"  history stats {TrendsAnalyzer().history.get_stats()}")
+    range_reads()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Replay a query log and compare cache hit rates for raw vs. normalized keys
+
+Usage: python benchmarks/replay_query_log.py [queries.log]
+
+The log holds one query per line, or JSON lines with a "query" field and an
+optional "timestamp" (epoch seconds). With timestamps, entries expire after
+CACHE_DURATION just like search_cache; without, the cache never expires.
+Without a log, a synthetic month of traffic (popular topics typed several
+ways plus a long tail of one-off queries) is used.
+"""
+
+import sys
+import os
+import json
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from app.services.query_normalizer import normalize_query
+
+SYNTHETIC_VARIANTS = [
+    ['wireless earbuds', 'Wireless Earbuds', 'wireless  earbuds', 'earbuds wireless', 'Wireless earbuds '],
+    ['kitchen gadgets', 'Kitchen Gadgets', 'gadgets for the kitchen', 'kitchen gadgets'],
+    ['yoga mat', 'Yoga Mat', 'yoga mats', 'mat for yoga'],
+    ['phone case', 'Phone Case', 'case for phone', 'phone  case'],
+    ['gym gear', 'Gym Gear', 'gear for the gym', 'gym gear'],
+    ['bluetooth speaker', 'Bluetooth Speaker', 'speaker bluetooth', 'bluetooth speakers'],
+]
+
+
+def load_log(path):
+    entries = []
+    with open(path) as log:
+        for line in log:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                record = json.loads(line)
+                entries.append((record.get('query', ''), record.get('timestamp')))
+            else:
+                entries.append((line, None))
+    return entries
+
+
+def synthetic_log(size=600, days=30, seed=7):
+    """A month of traffic: a few popular topics typed many ways, plus a long tail"""
+    rng = random.Random(seed)
+    # Popularity is skewed towards the first few topics, as in real traffic
+    weights = [len(SYNTHETIC_VARIANTS) - i for i in range(len(SYNTHETIC_VARIANTS))]
+    queries = [rng.choice(rng.choices(SYNTHETIC_VARIANTS, weights=weights)[0]) for _ in range(size)]
+    # Unique long-tail queries never hit under any keying
+    queries += [f"niche product {i}" for i in range(size // 5)]
+    timestamps = sorted(rng.uniform(0, days * 86400) for _ in queries)
+    rng.shuffle(queries)
+    return list(zip(queries, timestamps))
+
+
+def hit_rate(entries, key_fn):
+    cache = {}
+    hits = 0
+    for query, timestamp in entries:
+        key = key_fn(query)
+        if key in cache:
+            cached_at = cache[key]
+            if timestamp is None or cached_at is None or timestamp - cached_at < Config.CACHE_DURATION:
+                hits += 1
+                continue
+        cache[key] = timestamp
+    return hits / len(entries) if entries else 0.0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        entries = load_log(sys.argv[1])
+        source = sys.argv[1]
+    else:
+        entries = synthetic_log()
+        source = 'synthetic sample'
+
+    print(f"Replaying {len(entries)} queries from {source}")
+    baseline = hit_rate(entries, lambda q: q.strip())
+    safe = hit_rate(entries, lambda q: normalize_query(q, remove_stop_words=False, order_insensitive=False).key)
+    print(f"  {'raw (strip only)':20s} hit rate {baseline:6.1%}")
+    print(f"  {'safe default':20s} hit rate {safe:6.1%}  ({safe - baseline:+.1%} vs raw)"
+          f"  case + whitespace only; never merges different products")
+
+    # Opt-in modes trade some wrong merges ("hdmi to usb", "the office") for hits
+    print("  opt-in (may give different products one key):")
+    modes = [
+        ('+ stop words', lambda q: normalize_query(q, remove_stop_words=True, order_insensitive=False).key),
+        ('+ token order', lambda q: normalize_query(q, remove_stop_words=True, order_insensitive=True).key),
+    ]
+    for label, key_fn in modes:
+        rate = hit_rate(entries, key_fn)
+        print(f"    {label:18s} hit rate {rate:6.1%}  ({rate - safe:+.1%} vs safe default)")
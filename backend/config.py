@@ -5,13 +5,145 @@ load_dotenv()
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
-    DATABASE_URL = os.environ.get('DATABASE_URL') or 'sqlite:///marketminer.db'
+    DATABASE_URL = os.environ.get('DATABASE_URL') or 'sqlite:///database/marketminer.db'
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+    # OpenAI calls run on a shared async client: at most OPENAI_MAX_IN_FLIGHT
+    # at once, each bounded by OPENAI_TIMEOUT seconds (queueing included)
+    # before analysis falls back to local statistics. Estimated tokens are
+    # drawn from a bucket refilled at OPENAI_TOKENS_PER_MINUTE that holds at
+    # most OPENAI_TOKEN_BURST. OPENAI_BASE_URL can point at a local fake.
+    OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL', '')
+    OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+    OPENAI_MAX_TOKENS = int(os.environ.get('OPENAI_MAX_TOKENS', 1000))
+    OPENAI_MAX_IN_FLIGHT = int(os.environ.get('OPENAI_MAX_IN_FLIGHT', 4))
+    OPENAI_TIMEOUT = float(os.environ.get('OPENAI_TIMEOUT', 20))
+    OPENAI_TOKENS_PER_MINUTE = float(os.environ.get('OPENAI_TOKENS_PER_MINUTE', 40000))
+    OPENAI_TOKEN_BURST = float(os.environ.get('OPENAI_TOKEN_BURST', 10000))
     SERPAPI_KEY = os.environ.get('SERPAPI_KEY')
     
     # Scraping settings
-    CACHE_DURATION = 24 * 60 * 60  # 24 hours in seconds
+    CACHE_DURATION = int(os.environ.get('CACHE_DURATION', 24 * 60 * 60))  # 24 hours in seconds
+    CACHE_TTL_BY_PLATFORM = {
+        'amazon': int(os.environ.get('AMAZON_CACHE_TTL', CACHE_DURATION)),
+        'ebay': int(os.environ.get('EBAY_CACHE_TTL', CACHE_DURATION)),
+    }
+    # Stale-while-revalidate: past its TTL, an entry is still served (marked
+    # stale) for this many seconds while a background refresh replaces it.
+    # 0 disables it, so expired entries are re-scraped in the request.
+    CACHE_STALE_WINDOW = int(os.environ.get('CACHE_STALE_WINDOW', 24 * 60 * 60))
+    REVALIDATE_MAX_WORKERS = int(os.environ.get('REVALIDATE_MAX_WORKERS', 4))
+    # Google Trends results; mock data served after an upstream error is
+    # cached briefly so the real data is retried soon
+    TRENDS_CACHE_TTL = int(os.environ.get('TRENDS_CACHE_TTL', 24 * 60 * 60))
+    TRENDS_FALLBACK_TTL = int(os.environ.get('TRENDS_FALLBACK_TTL', 5 * 60))
+    # Keyword sets over Google's 5-per-request limit are split into anchored
+    # groups fetched in parallel (still subject to the rate limiter)
+    TRENDS_MAX_KEYWORDS = int(os.environ.get('TRENDS_MAX_KEYWORDS', 25))
+    TRENDS_MAX_WORKERS = int(os.environ.get('TRENDS_MAX_WORKERS', 4))
+    # Pooled pytrends clients: created and kept topped up in the background
+    # once the worker has served its first request, idle cookies renewed
+    # after TRENDS_SESSION_MAX_AGE seconds
+    TRENDS_SESSION_POOL_SIZE = int(os.environ.get('TRENDS_SESSION_POOL_SIZE', 4))
+    TRENDS_SESSION_MAX_AGE = float(os.environ.get('TRENDS_SESSION_MAX_AGE', 30 * 60))
+    TRENDS_SESSION_REFRESH_INTERVAL = float(os.environ.get('TRENDS_SESSION_REFRESH_INTERVAL', 60))
+    # The three sub-queries of each request run concurrently with their own
+    # deadlines (seconds); only interest_over_time is required
+    TRENDS_SUBFETCH_WORKERS = int(os.environ.get('TRENDS_SUBFETCH_WORKERS', 12))
+    TRENDS_SUBFETCH_TIMEOUTS = {
+        'interest_over_time': float(os.environ.get('TRENDS_INTEREST_TIMEOUT', 30)),
+        'related_queries': float(os.environ.get('TRENDS_RELATED_TIMEOUT', 10)),
+        'interest_by_region': float(os.environ.get('TRENDS_REGION_TIMEOUT', 10)),
+    }
+    # Interest-over-time history kept on disk (memory-mapped arrays under
+    # TRENDS_SERIES_DIR, by default next to the database). Refreshes fetch
+    # only the points since the last stored one plus TRENDS_SERIES_OVERLAP
+    # points to rescale against, at most once per TRENDS_SERIES_DELTA_INTERVAL
+    # seconds. Gaps over TRENDS_SERIES_MAX_DELTA_DAYS, and series not fully
+    # re-fetched for TRENDS_SERIES_FULL_REFRESH seconds, get a full fetch.
+    TRENDS_SERIES_ENABLED = os.environ.get('TRENDS_SERIES_ENABLED', 'true').lower() == 'true'
+    TRENDS_SERIES_DIR = os.environ.get('TRENDS_SERIES_DIR', '')
+    TRENDS_SERIES_OVERLAP = int(os.environ.get('TRENDS_SERIES_OVERLAP', 4))
+    TRENDS_SERIES_DELTA_INTERVAL = int(os.environ.get('TRENDS_SERIES_DELTA_INTERVAL', 60 * 60))
+    TRENDS_SERIES_MAX_DELTA_DAYS = int(os.environ.get('TRENDS_SERIES_MAX_DELTA_DAYS', 90))
+    TRENDS_SERIES_FULL_REFRESH = int(os.environ.get('TRENDS_SERIES_FULL_REFRESH', 7 * 24 * 60 * 60))
+    # Pre-warming: the PREWARM_TOP_N most popular (query, platform) keys, by
+    # a hit count that halves every PREWARM_HALF_LIFE seconds, are re-scraped
+    # once they are within PREWARM_LEAD_TIME seconds of expiring. Refreshes
+    # leave PREWARM_MIN_TOKENS of each host's rate budget for users and wait
+    # for PREWARM_QUIET_PERIOD seconds without interactive searches.
+    PREWARM_ENABLED = os.environ.get('PREWARM_ENABLED', 'true').lower() == 'true'
+    PREWARM_TOP_N = int(os.environ.get('PREWARM_TOP_N', 25))
+    PREWARM_INTERVAL = float(os.environ.get('PREWARM_INTERVAL', 60))
+    PREWARM_LEAD_TIME = float(os.environ.get('PREWARM_LEAD_TIME', 30 * 60))
+    PREWARM_HALF_LIFE = float(os.environ.get('PREWARM_HALF_LIFE', 12 * 60 * 60))
+    PREWARM_MIN_TOKENS = float(os.environ.get('PREWARM_MIN_TOKENS', 2))
+    PREWARM_QUIET_PERIOD = float(os.environ.get('PREWARM_QUIET_PERIOD', 5))
+    # Distinct keys buffered between flushes; the coldest are dropped past this
+    PREWARM_MAX_PENDING = int(os.environ.get('PREWARM_MAX_PENDING', 10000))
+    # search_cache is trimmed to this size by a background job
+    CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    CACHE_EVICTION_INTERVAL = float(os.environ.get('CACHE_EVICTION_INTERVAL', 15 * 60))
+    # Compression for cached result BLOBs: 'zlib', 'zstd' (needs zstandard) or 'none'
+    CACHE_COMPRESSION = os.environ.get('CACHE_COMPRESSION', 'zlib')
+    # In-process tier in front of search_cache, bounded by approximate memory use
+    MEMORY_CACHE_MAX_BYTES = int(os.environ.get('MEMORY_CACHE_MAX_BYTES', 64 * 1024 * 1024))
     MAX_PRODUCTS_PER_SEARCH = 50
+    # HTML extraction backend: 'lxml' (compiled selectors) or 'bs4'
+    SCRAPER_PARSER = os.environ.get('SCRAPER_PARSER', 'lxml')
+    # Streaming mode reads result pages in chunks and stops once enough
+    # products are extracted or the byte cap is reached (requires lxml)
+    SCRAPER_STREAMING = os.environ.get('SCRAPER_STREAMING', 'true').lower() == 'true'
+    SCRAPER_CHUNK_SIZE = int(os.environ.get('SCRAPER_CHUNK_SIZE', 64 * 1024))
+    SCRAPER_MAX_BYTES = int(os.environ.get('SCRAPER_MAX_BYTES', 4 * 1024 * 1024))
     
-    # Rate limiting
-    REQUESTS_PER_MINUTE = 60
\ No newline at end of file
+    # Query normalization for cache and coalescing keys. Case and whitespace
+    # are always folded; stop-word removal and token sorting are opt-in,
+    # since they can give different products one key ("the office dvd")
+    QUERY_REMOVE_STOP_WORDS = os.environ.get('QUERY_REMOVE_STOP_WORDS', 'false').lower() == 'true'
+    QUERY_ORDER_INSENSITIVE = os.environ.get('QUERY_ORDER_INSENSITIVE', 'false').lower() == 'true'
+    
+    # Platform fan-out: searches run concurrently on a bounded pool and each
+    # platform gets its own deadline (seconds) before it is reported as partial
+    SEARCH_MAX_WORKERS = int(os.environ.get('SEARCH_MAX_WORKERS', 8))
+    PLATFORM_TIMEOUT = float(os.environ.get('PLATFORM_TIMEOUT', 15))
+    PLATFORM_TIMEOUTS = {
+        'amazon': float(os.environ.get('AMAZON_TIMEOUT', PLATFORM_TIMEOUT)),
+        'ebay': float(os.environ.get('EBAY_TIMEOUT', PLATFORM_TIMEOUT)),
+    }
+    # Streamed opportunity reports fetch trends on this pool while the
+    # product search runs, instead of one after the other
+    ANALYSIS_STREAM_WORKERS = int(os.environ.get('ANALYSIS_STREAM_WORKERS', 4))
+    
+    # Identical concurrent scrapes are coalesced; the leader holds a lease in
+    # SQLite so other worker processes wait for its result instead of scraping
+    SINGLE_FLIGHT_LEASE_TTL = float(os.environ.get('SINGLE_FLIGHT_LEASE_TTL', 30))
+    SINGLE_FLIGHT_POLL_INTERVAL = float(os.environ.get('SINGLE_FLIGHT_POLL_INTERVAL', 0.2))
+    
+    # Rate limiting: outbound requests per host, with a burst allowance that
+    # lets an idle host be hit without waiting
+    REQUESTS_PER_MINUTE = int(os.environ.get('REQUESTS_PER_MINUTE', 60))
+    RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', 5))
+    
+    # Pooled HTTP client shared by the scrapers
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 10))
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 10))
+    HTTP_HOST_POOL_SIZES = {
+        'www.amazon.com': int(os.environ.get('HTTP_AMAZON_POOL_SIZE', 20)),
+        'www.ebay.com': int(os.environ.get('HTTP_EBAY_POOL_SIZE', 20)),
+    }
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+    HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', 0.3))
+    # A 502/503/504 asking to wait longer than this is returned, not retried
+    HTTP_MAX_RETRY_AFTER = float(os.environ.get('HTTP_MAX_RETRY_AFTER', 10))
+    
+    # SQLite tuning (DATABASE_URL must be a sqlite:/// URL)
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_LOCK_RETRIES = int(os.environ.get('SQLITE_LOCK_RETRIES', 3))
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_CACHE_KB = int(os.environ.get('SQLITE_CACHE_KB', 16 * 1024))
+    SQLITE_MMAP_BYTES = int(os.environ.get('SQLITE_MMAP_BYTES', 64 * 1024 * 1024))
+    
+    # Write-behind product persistence
+    WRITE_BATCH_SIZE = int(os.environ.get('WRITE_BATCH_SIZE', 200))
+    WRITE_FLUSH_INTERVAL = float(os.environ.get('WRITE_FLUSH_INTERVAL', 1.0))
+    WRITE_QUEUE_SIZE = int(os.environ.get('WRITE_QUEUE_SIZE', 10000))
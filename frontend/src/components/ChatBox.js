@@ -2,7 +2,7 @@ import React, { useState, useRef, useEffect } from 'react';
 import { Send, Loader, Sparkles } from 'lucide-react';
 import MessageBubble from './MessageBubble';
 import ProductSuggestions from './ProductSuggestions';
-import { processChatMessage } from '../utils/api';
+import { streamChatMessage } from '../utils/api';
 
 const ChatBox = ({ onSearch, isLoading }) => {
   const [messages, setMessages] = useState([
@@ -56,46 +56,56 @@ const ChatBox = ({ onSearch, isLoading }) => {
         context: conversationContext
       };
       
-      // Process the natural language query via API
-      const response = await processChatMessage(requestData);
-      const data = response.data;
-      
-      console.log('✅ Received response:', data);
-      
-      // Add AI response
-      setTimeout(() => {
-        const aiMessage = {
-          id: Date.now() + 1,
-          type: 'ai',
-          content: data.ai_response,
-          timestamp: new Date(),
-          products: data.products,
-          searchQuery: data.search_query
-        };
-        
-        setMessages(prev => [...prev, aiMessage]);
-        setIsTyping(false);
-
-        // Update conversation context with the actual products and query
-        setConversationContext(prev => ({
-          lastQuery: data.search_query || prev.lastQuery,
-          lastProducts: data.products || prev.lastProducts,
-          conversationHistory: [...prev.conversationHistory, {
-            user: inputValue.trim(),
-            ai: data.ai_response,
-            timestamp: new Date()
-          }].slice(-5) // Keep last 5 exchanges
-        }));
-
-        // Trigger search if needed (for external search functionality)
-        if (data.should_search && data.search_query && onSearch) {
-          onSearch(data.search_query, {
-            platforms: ['Amazon', 'eBay'],
-            priceRange: {}
-          });
+      // Stream the reply: text first, then product cards as they resolve
+      const aiMessageId = Date.now() + 1;
+      const products = [];
+      let reply = '';
+      let searchQuery = null;
+
+      await streamChatMessage(requestData, (event, data) => {
+        if (event === 'ack') {
+          reply = data.ai_response;
+          searchQuery = data.search_query || null;
+          setIsTyping(false);
+          setMessages(prev => [...prev, {
+            id: aiMessageId,
+            type: 'ai',
+            content: reply,
+            timestamp: new Date(),
+            products: [],
+            searchQuery
+          }]);
+        } else if (event === 'product') {
+          products[data.index] = data.product;
+          const shown = products.filter(Boolean);
+          setMessages(prev => prev.map(message => (
+            message.id === aiMessageId ? { ...message, products: shown } : message
+          )));
+        } else if (event === 'done') {
+          console.log('✅ Stream finished:', data);
+
+          // Update conversation context with the actual products and query
+          setConversationContext(prev => ({
+            lastQuery: searchQuery || prev.lastQuery,
+            lastProducts: products.length ? products.filter(Boolean) : prev.lastProducts,
+            conversationHistory: [...prev.conversationHistory, {
+              user: requestData.message,
+              ai: reply,
+              timestamp: new Date()
+            }].slice(-5) // Keep last 5 exchanges
+          }));
+
+          // Trigger search if needed (for external search functionality)
+          if (data.should_search && searchQuery && onSearch) {
+            onSearch(searchQuery, {
+              platforms: ['Amazon', 'eBay'],
+              priceRange: {}
+            });
+          }
+        } else if (event === 'error') {
+          throw new Error(data.error);
         }
-      }, 800 + Math.random() * 800); // Simulate AI thinking time
-
+      });
     } catch (error) {
       setIsTyping(false);
       const errorMessage = {
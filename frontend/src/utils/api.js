@@ -86,4 +86,62 @@ export const processChatMessage = (messageData) => {
   return api.post('/api/chat/process', payload);
 };
 
+// Server-Sent Events over POST: EventSource only supports GET, so the stream
+// is read with fetch and split into frames here. Calls onEvent(name, data)
+// for every event and resolves once the server closes the stream.
+const postEventStream = async (path, payload, onEvent, signal) => {
+  const response = await fetch(`${api.defaults.baseURL}${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(payload),
+    signal
+  });
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.error || `Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let name = 'message';
+      let data = '';
+      frame.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) name = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      });
+      if (data) onEvent(name, JSON.parse(data));
+    }
+  }
+};
+
+// Streaming chat: `ack` (reply text), one `product` per card, then `done`
+export const streamChatMessage = (messageData, onEvent, signal) => {
+  const payload = typeof messageData === 'string'
+    ? { message: messageData }
+    : messageData;
+
+  return postEventStream('/api/chat/process/stream', payload, onEvent, signal);
+};
+
+// Streaming opportunity report: one event per section as it becomes ready
+// (`product_data`, `trend_data`, `opportunity_score`, `ai_analysis`,
+// `recommendations`), each with `data` and `duration_ms`, then `done`
+export const streamOpportunityAnalysis = (query, onEvent, { platforms = ['Amazon', 'eBay'], includeTrends = true, signal } = {}) => {
+  return postEventStream('/api/analysis/opportunity/stream', {
+    query,
+    platforms,
+    include_trends: includeTrends
+  }, onEvent, signal);
+};
+
 export default api;
\ No newline at end of file